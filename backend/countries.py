@@ -0,0 +1,151 @@
+"""
+Countries - ISO 3166-1 country codes and the names sources spell them with
+"""
+import re
+import unicodedata
+from typing import Optional
+
+# (alpha-2, alpha-3, short name) of every ISO 3166-1 country
+ISO_COUNTRIES = [
+    ('AF', 'AFG', 'Afghanistan'), ('AX', 'ALA', 'Aland Islands'), ('AL', 'ALB', 'Albania'),
+    ('DZ', 'DZA', 'Algeria'), ('AS', 'ASM', 'American Samoa'), ('AD', 'AND', 'Andorra'),
+    ('AO', 'AGO', 'Angola'), ('AI', 'AIA', 'Anguilla'), ('AQ', 'ATA', 'Antarctica'),
+    ('AG', 'ATG', 'Antigua and Barbuda'), ('AR', 'ARG', 'Argentina'), ('AM', 'ARM', 'Armenia'),
+    ('AW', 'ABW', 'Aruba'), ('AU', 'AUS', 'Australia'), ('AT', 'AUT', 'Austria'),
+    ('AZ', 'AZE', 'Azerbaijan'), ('BS', 'BHS', 'Bahamas'), ('BH', 'BHR', 'Bahrain'),
+    ('BD', 'BGD', 'Bangladesh'), ('BB', 'BRB', 'Barbados'), ('BY', 'BLR', 'Belarus'),
+    ('BE', 'BEL', 'Belgium'), ('BZ', 'BLZ', 'Belize'), ('BJ', 'BEN', 'Benin'),
+    ('BM', 'BMU', 'Bermuda'), ('BT', 'BTN', 'Bhutan'), ('BO', 'BOL', 'Bolivia'),
+    ('BQ', 'BES', 'Bonaire, Sint Eustatius and Saba'), ('BA', 'BIH', 'Bosnia and Herzegovina'),
+    ('BW', 'BWA', 'Botswana'), ('BV', 'BVT', 'Bouvet Island'), ('BR', 'BRA', 'Brazil'),
+    ('IO', 'IOT', 'British Indian Ocean Territory'), ('BN', 'BRN', 'Brunei Darussalam'),
+    ('BG', 'BGR', 'Bulgaria'), ('BF', 'BFA', 'Burkina Faso'), ('BI', 'BDI', 'Burundi'),
+    ('CV', 'CPV', 'Cabo Verde'), ('KH', 'KHM', 'Cambodia'), ('CM', 'CMR', 'Cameroon'),
+    ('CA', 'CAN', 'Canada'), ('KY', 'CYM', 'Cayman Islands'), ('CF', 'CAF', 'Central African Republic'),
+    ('TD', 'TCD', 'Chad'), ('CL', 'CHL', 'Chile'), ('CN', 'CHN', 'China'),
+    ('CX', 'CXR', 'Christmas Island'), ('CC', 'CCK', 'Cocos (Keeling) Islands'), ('CO', 'COL', 'Colombia'),
+    ('KM', 'COM', 'Comoros'), ('CG', 'COG', 'Congo'), ('CD', 'COD', 'Democratic Republic of the Congo'),
+    ('CK', 'COK', 'Cook Islands'), ('CR', 'CRI', 'Costa Rica'), ('CI', 'CIV', "Cote d'Ivoire"),
+    ('HR', 'HRV', 'Croatia'), ('CU', 'CUB', 'Cuba'), ('CW', 'CUW', 'Curacao'),
+    ('CY', 'CYP', 'Cyprus'), ('CZ', 'CZE', 'Czechia'), ('DK', 'DNK', 'Denmark'),
+    ('DJ', 'DJI', 'Djibouti'), ('DM', 'DMA', 'Dominica'), ('DO', 'DOM', 'Dominican Republic'),
+    ('EC', 'ECU', 'Ecuador'), ('EG', 'EGY', 'Egypt'), ('SV', 'SLV', 'El Salvador'),
+    ('GQ', 'GNQ', 'Equatorial Guinea'), ('ER', 'ERI', 'Eritrea'), ('EE', 'EST', 'Estonia'),
+    ('SZ', 'SWZ', 'Eswatini'), ('ET', 'ETH', 'Ethiopia'), ('FK', 'FLK', 'Falkland Islands'),
+    ('FO', 'FRO', 'Faroe Islands'), ('FJ', 'FJI', 'Fiji'), ('FI', 'FIN', 'Finland'),
+    ('FR', 'FRA', 'France'), ('GF', 'GUF', 'French Guiana'), ('PF', 'PYF', 'French Polynesia'),
+    ('TF', 'ATF', 'French Southern Territories'), ('GA', 'GAB', 'Gabon'), ('GM', 'GMB', 'Gambia'),
+    ('GE', 'GEO', 'Georgia'), ('DE', 'DEU', 'Germany'), ('GH', 'GHA', 'Ghana'),
+    ('GI', 'GIB', 'Gibraltar'), ('GR', 'GRC', 'Greece'), ('GL', 'GRL', 'Greenland'),
+    ('GD', 'GRD', 'Grenada'), ('GP', 'GLP', 'Guadeloupe'), ('GU', 'GUM', 'Guam'),
+    ('GT', 'GTM', 'Guatemala'), ('GG', 'GGY', 'Guernsey'), ('GN', 'GIN', 'Guinea'),
+    ('GW', 'GNB', 'Guinea-Bissau'), ('GY', 'GUY', 'Guyana'), ('HT', 'HTI', 'Haiti'),
+    ('HM', 'HMD', 'Heard Island and McDonald Islands'), ('VA', 'VAT', 'Holy See'),
+    ('HN', 'HND', 'Honduras'), ('HK', 'HKG', 'Hong Kong'), ('HU', 'HUN', 'Hungary'),
+    ('IS', 'ISL', 'Iceland'), ('IN', 'IND', 'India'), ('ID', 'IDN', 'Indonesia'),
+    ('IR', 'IRN', 'Iran'), ('IQ', 'IRQ', 'Iraq'), ('IE', 'IRL', 'Ireland'),
+    ('IM', 'IMN', 'Isle of Man'), ('IL', 'ISR', 'Israel'), ('IT', 'ITA', 'Italy'),
+    ('JM', 'JAM', 'Jamaica'), ('JP', 'JPN', 'Japan'), ('JE', 'JEY', 'Jersey'),
+    ('JO', 'JOR', 'Jordan'), ('KZ', 'KAZ', 'Kazakhstan'), ('KE', 'KEN', 'Kenya'),
+    ('KI', 'KIR', 'Kiribati'), ('KP', 'PRK', 'North Korea'), ('KR', 'KOR', 'South Korea'),
+    ('KW', 'KWT', 'Kuwait'), ('KG', 'KGZ', 'Kyrgyzstan'), ('LA', 'LAO', 'Laos'),
+    ('LV', 'LVA', 'Latvia'), ('LB', 'LBN', 'Lebanon'), ('LS', 'LSO', 'Lesotho'),
+    ('LR', 'LBR', 'Liberia'), ('LY', 'LBY', 'Libya'), ('LI', 'LIE', 'Liechtenstein'),
+    ('LT', 'LTU', 'Lithuania'), ('LU', 'LUX', 'Luxembourg'), ('MO', 'MAC', 'Macao'),
+    ('MG', 'MDG', 'Madagascar'), ('MW', 'MWI', 'Malawi'), ('MY', 'MYS', 'Malaysia'),
+    ('MV', 'MDV', 'Maldives'), ('ML', 'MLI', 'Mali'), ('MT', 'MLT', 'Malta'),
+    ('MH', 'MHL', 'Marshall Islands'), ('MQ', 'MTQ', 'Martinique'), ('MR', 'MRT', 'Mauritania'),
+    ('MU', 'MUS', 'Mauritius'), ('YT', 'MYT', 'Mayotte'), ('MX', 'MEX', 'Mexico'),
+    ('FM', 'FSM', 'Micronesia'), ('MD', 'MDA', 'Moldova'), ('MC', 'MCO', 'Monaco'),
+    ('MN', 'MNG', 'Mongolia'), ('ME', 'MNE', 'Montenegro'), ('MS', 'MSR', 'Montserrat'),
+    ('MA', 'MAR', 'Morocco'), ('MZ', 'MOZ', 'Mozambique'), ('MM', 'MMR', 'Myanmar'),
+    ('NA', 'NAM', 'Namibia'), ('NR', 'NRU', 'Nauru'), ('NP', 'NPL', 'Nepal'),
+    ('NL', 'NLD', 'Netherlands'), ('NC', 'NCL', 'New Caledonia'), ('NZ', 'NZL', 'New Zealand'),
+    ('NI', 'NIC', 'Nicaragua'), ('NE', 'NER', 'Niger'), ('NG', 'NGA', 'Nigeria'),
+    ('NU', 'NIU', 'Niue'), ('NF', 'NFK', 'Norfolk Island'), ('MK', 'MKD', 'North Macedonia'),
+    ('MP', 'MNP', 'Northern Mariana Islands'), ('NO', 'NOR', 'Norway'), ('OM', 'OMN', 'Oman'),
+    ('PK', 'PAK', 'Pakistan'), ('PW', 'PLW', 'Palau'), ('PS', 'PSE', 'Palestine'),
+    ('PA', 'PAN', 'Panama'), ('PG', 'PNG', 'Papua New Guinea'), ('PY', 'PRY', 'Paraguay'),
+    ('PE', 'PER', 'Peru'), ('PH', 'PHL', 'Philippines'), ('PN', 'PCN', 'Pitcairn'),
+    ('PL', 'POL', 'Poland'), ('PT', 'PRT', 'Portugal'), ('PR', 'PRI', 'Puerto Rico'),
+    ('QA', 'QAT', 'Qatar'), ('RE', 'REU', 'Reunion'), ('RO', 'ROU', 'Romania'),
+    ('RU', 'RUS', 'Russia'), ('RW', 'RWA', 'Rwanda'), ('BL', 'BLM', 'Saint Barthelemy'),
+    ('SH', 'SHN', 'Saint Helena, Ascension and Tristan da Cunha'), ('KN', 'KNA', 'Saint Kitts and Nevis'),
+    ('LC', 'LCA', 'Saint Lucia'), ('MF', 'MAF', 'Saint Martin'), ('PM', 'SPM', 'Saint Pierre and Miquelon'),
+    ('VC', 'VCT', 'Saint Vincent and the Grenadines'), ('WS', 'WSM', 'Samoa'), ('SM', 'SMR', 'San Marino'),
+    ('ST', 'STP', 'Sao Tome and Principe'), ('SA', 'SAU', 'Saudi Arabia'), ('SN', 'SEN', 'Senegal'),
+    ('RS', 'SRB', 'Serbia'), ('SC', 'SYC', 'Seychelles'), ('SL', 'SLE', 'Sierra Leone'),
+    ('SG', 'SGP', 'Singapore'), ('SX', 'SXM', 'Sint Maarten'), ('SK', 'SVK', 'Slovakia'),
+    ('SI', 'SVN', 'Slovenia'), ('SB', 'SLB', 'Solomon Islands'), ('SO', 'SOM', 'Somalia'),
+    ('ZA', 'ZAF', 'South Africa'), ('GS', 'SGS', 'South Georgia and the South Sandwich Islands'),
+    ('SS', 'SSD', 'South Sudan'), ('ES', 'ESP', 'Spain'), ('LK', 'LKA', 'Sri Lanka'),
+    ('SD', 'SDN', 'Sudan'), ('SR', 'SUR', 'Suriname'), ('SJ', 'SJM', 'Svalbard and Jan Mayen'),
+    ('SE', 'SWE', 'Sweden'), ('CH', 'CHE', 'Switzerland'), ('SY', 'SYR', 'Syria'),
+    ('TW', 'TWN', 'Taiwan'), ('TJ', 'TJK', 'Tajikistan'), ('TZ', 'TZA', 'Tanzania'),
+    ('TH', 'THA', 'Thailand'), ('TL', 'TLS', 'Timor-Leste'), ('TG', 'TGO', 'Togo'),
+    ('TK', 'TKL', 'Tokelau'), ('TO', 'TON', 'Tonga'), ('TT', 'TTO', 'Trinidad and Tobago'),
+    ('TN', 'TUN', 'Tunisia'), ('TR', 'TUR', 'Turkey'), ('TM', 'TKM', 'Turkmenistan'),
+    ('TC', 'TCA', 'Turks and Caicos Islands'), ('TV', 'TUV', 'Tuvalu'), ('UG', 'UGA', 'Uganda'),
+    ('UA', 'UKR', 'Ukraine'), ('AE', 'ARE', 'United Arab Emirates'), ('GB', 'GBR', 'United Kingdom'),
+    ('US', 'USA', 'United States'), ('UM', 'UMI', 'United States Minor Outlying Islands'),
+    ('UY', 'URY', 'Uruguay'), ('UZ', 'UZB', 'Uzbekistan'), ('VU', 'VUT', 'Vanuatu'),
+    ('VE', 'VEN', 'Venezuela'), ('VN', 'VNM', 'Vietnam'), ('VG', 'VGB', 'British Virgin Islands'),
+    ('VI', 'VIR', 'U.S. Virgin Islands'), ('WF', 'WLF', 'Wallis and Futuna'), ('EH', 'ESH', 'Western Sahara'),
+    ('YE', 'YEM', 'Yemen'), ('ZM', 'ZMB', 'Zambia'), ('ZW', 'ZWE', 'Zimbabwe'),
+]
+
+# Other spellings sources use for a country (official names, former names, constituent countries)
+COUNTRY_NAME_ALIASES = {
+    'united states of america': 'US', 'america': 'US', 'u s': 'US', 'u s a': 'US',
+    'united kingdom of great britain and northern ireland': 'GB', 'great britain': 'GB', 'britain': 'GB',
+    'england': 'GB', 'scotland': 'GB', 'wales': 'GB', 'northern ireland': 'GB', 'u k': 'GB',
+    'holland': 'NL', 'kingdom of the netherlands': 'NL',
+    'korea': 'KR', 'republic of korea': 'KR', 'korea republic of': 'KR',
+    'democratic people s republic of korea': 'KP', 'korea democratic people s republic of': 'KP',
+    'russian federation': 'RU', 'viet nam': 'VN', 'iran islamic republic of': 'IR',
+    'czech republic': 'CZ', 'brunei': 'BN', 'cape verde': 'CV', 'swaziland': 'SZ', 'east timor': 'TL',
+    'macau': 'MO', 'macao sar': 'MO', 'hong kong sar': 'HK', 'hong kong sar china': 'HK',
+    'ivory coast': 'CI', 'macedonia': 'MK', 'republic of north macedonia': 'MK',
+    'burma': 'MM', 'vatican': 'VA', 'vatican city': 'VA', 'turkiye': 'TR', 'uae': 'AE',
+    'lao people s democratic republic': 'LA', 'syrian arab republic': 'SY', 'republic of moldova': 'MD',
+    'moldova republic of': 'MD', 'tanzania united republic of': 'TZ', 'united republic of tanzania': 'TZ',
+    'bolivia plurinational state of': 'BO', 'venezuela bolivarian republic of': 'VE',
+    'taiwan province of china': 'TW', 'republic of china': 'TW', 'people s republic of china': 'CN',
+    'state of palestine': 'PS', 'palestine state of': 'PS', 'congo kinshasa': 'CD', 'dr congo': 'CD',
+    'drc': 'CD', 'congo brazzaville': 'CG', 'republic of the congo': 'CG', 'micronesia federated states of': 'FM',
+    'bahamas the': 'BS', 'gambia the': 'GM', 'republic of ireland': 'IE', 'reunion island': 'RE',
+    'curacao island': 'CW', 'st kitts and nevis': 'KN', 'st lucia': 'LC', 'st vincent and the grenadines': 'VC',
+}
+
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+def _name_key(name: str) -> str:
+    """Lowercase unaccented words of a country name, without a leading "the" """
+    name = ''.join(char for char in unicodedata.normalize('NFKD', name) if not unicodedata.combining(char))
+    key = NON_ALPHANUMERIC.sub(' ', name.lower()).strip()
+    return key[4:] if key.startswith('the ') else key
+
+COUNTRY_CODES = {
+    **{alpha2: alpha2 for alpha2, _, _ in ISO_COUNTRIES},
+    **{alpha3: alpha2 for alpha2, alpha3, _ in ISO_COUNTRIES},
+    # Not an ISO code, but what most sources write for GB
+    'UK': 'GB',
+}
+COUNTRY_NAMES = {
+    **{_name_key(name): alpha2 for alpha2, _, name in ISO_COUNTRIES},
+    **COUNTRY_NAME_ALIASES,
+}
+
+def country_code(value: Optional[str], allow_codes: bool = True) -> Optional[str]:
+    """
+    ISO 3166-1 alpha-2 code of a country name or code ("The Netherlands" -> "NL",
+    "CHL" -> "CL"), or None if the value is not a recognised country. With
+    allow_codes off only names are recognised, for values where a short token may
+    be something else (a US state like "CA" at the end of an address).
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if allow_codes and value.upper() in COUNTRY_CODES:
+        return COUNTRY_CODES[value.upper()]
+    return COUNTRY_NAMES.get(_name_key(value))
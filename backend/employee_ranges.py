@@ -0,0 +1,104 @@
+"""
+Employee Ranges - Normalizes each source's employee count into numeric employees_min/employees_max
+"""
+import math
+import re
+from typing import Dict, Optional, Tuple
+
+# "250", "1,000", "11-50", "11 - 50", "10001+"
+EMPLOYEE_RANGE_PATTERN = re.compile(r'^\s*(\d[\d,]*)\s*(?:(\+)|-\s*(\d[\d,]*))?\s*$')
+
+# LinkedIn's companies.csv grades company_size from 0 (smallest) to 7 (largest), in the
+# employee-count buckets LinkedIn shows on company pages
+LINKEDIN_COMPANY_SIZE_RANGES = {
+    0: (1, 10),
+    1: (11, 50),
+    2: (51, 200),
+    3: (201, 500),
+    4: (501, 1000),
+    5: (1001, 5000),
+    6: (5001, 10000),
+    7: (10001, None),
+}
+
+UNKNOWN_RANGE = (None, None)
+
+def _is_missing(value) -> bool:
+    if value is None or isinstance(value, bool):
+        return True
+    if isinstance(value, float):
+        return math.isnan(value) or math.isinf(value)
+    # pandas NA and friends refuse to be compared or truthy-tested
+    try:
+        return bool(value != value)
+    except TypeError:
+        return True
+
+def parse_employee_range(value) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (min, max) employees for an exact count or a range string. An open-ended range
+    like "10001+" has max None; an unparseable value gives (None, None).
+    """
+    if _is_missing(value):
+        return UNKNOWN_RANGE
+    if isinstance(value, (int, float)):
+        return int(value), int(value)
+    match = EMPLOYEE_RANGE_PATTERN.match(str(value))
+    if not match:
+        return UNKNOWN_RANGE
+    low = int(match.group(1).replace(',', ''))
+    if match.group(2):
+        return low, None
+    if match.group(3):
+        return low, int(match.group(3).replace(',', ''))
+    return low, low
+
+def parse_linkedin_company_size(value) -> Tuple[Optional[int], Optional[int]]:
+    """Range for LinkedIn's 0-7 company_size grade (or a range string)"""
+    if isinstance(value, str):
+        return parse_employee_range(value)
+    if _is_missing(value):
+        return UNKNOWN_RANGE
+    return LINKEDIN_COMPANY_SIZE_RANGES.get(int(value), UNKNOWN_RANGE)
+
+# Fields each collection's employee range is derived from, most precise first
+EMPLOYEE_RANGE_SOURCES = {
+    'crunchbase_companies': [('num_employees', parse_employee_range)],
+    'linkedin_companies': [('employee_count', parse_employee_range), ('company_size', parse_linkedin_company_size)],
+    'enriched_data': [('employee_count', parse_employee_range)],
+}
+
+def employee_range(record: Dict, collection_name: str) -> Tuple[Optional[int], Optional[int]]:
+    """The first known range among the collection's employee fields"""
+    for field, parse in EMPLOYEE_RANGE_SOURCES[collection_name]:
+        low, high = parse(record.get(field))
+        if low is not None:
+            return low, high
+    return UNKNOWN_RANGE
+
+def add_employee_range(record: Dict, collection_name: str) -> Dict:
+    """Set employees_min/employees_max on a record (None when the size is unknown)"""
+    record['employees_min'], record['employees_max'] = employee_range(record, collection_name)
+    return record
+
+# Company size buckets used for facets, by lower bound
+EMPLOYEE_BUCKETS = [
+    (1, '1-10'),
+    (11, '11-50'),
+    (51, '51-200'),
+    (201, '201-500'),
+    (501, '501-1000'),
+    (1001, '1001-5000'),
+    (5001, '5001-10000'),
+    (10001, '10001+'),
+]
+
+def employee_bucket(employees_min: Optional[int]) -> Optional[str]:
+    """Size bucket containing a company's lower employee bound (None when unknown)"""
+    if employees_min is None:
+        return None
+    bucket = None
+    for lower_bound, label in EMPLOYEE_BUCKETS:
+        if employees_min >= lower_bound:
+            bucket = label
+    return bucket or EMPLOYEE_BUCKETS[0][1]
@@ -0,0 +1,126 @@
+"""
+Enriched View - Materialized enriched_companies collection, rebuilt after each load
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from typing import Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from enrichment_service import ENRICHED_VIEW_COLLECTION, EnrichmentService
+
+logger = logging.getLogger(__name__)
+
+# Source collections materialized, with the source name used to enrich their documents.
+# Apollo rows in enriched_data are stored enriched already.
+ENRICHED_VIEW_SOURCES = [
+    ('crunchbase_companies', 'crunchbase'),
+    ('linkedin_companies', 'linkedin'),
+]
+
+# Enriched documents written per bulk_write
+VIEW_WRITE_BATCH_SIZE = int(os.environ.get('ENRICHED_VIEW_WRITE_BATCH_SIZE', 1000))
+
+# Holds the id of the last completed build. Records of any other build are leftovers of
+# a rebuild that did not finish.
+ENRICHED_VIEW_STATE_COLLECTION = 'enriched_view_state'
+
+class EnrichedCompanyView:
+    """
+    Keeps enriched_companies holding the fully enriched record of every Crunchbase and
+    LinkedIn company, keyed by the source document's _id and tagged with the id of the
+    build that wrote it. Search reads these records instead of enriching each hit, as
+    long as the view is current; while it is stale (between a load and the rebuild that
+    follows it) search enriches live.
+    
+    A build clears the completed-build marker before writing and sets it once the
+    records of older builds are deleted, so a process that starts after a rebuild died
+    part-way rebuilds the view instead of adopting a mix of two builds.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase, data_loader):
+        self.db = db
+        self.data_loader = data_loader
+        self.enrichment = EnrichmentService(db)
+        # Data generation the view is current for, and the _build its records carry
+        self.built_generation = None
+        self.view_build = None
+        self.last_report = None
+        self.lock = asyncio.Lock()
+    
+    def current_build(self) -> Optional[str]:
+        """The _build of the view's records, or None while the view is stale"""
+        if self.built_generation is None or self.built_generation != self.data_loader.generation:
+            return None
+        return self.view_build
+    
+    async def run(self, force: bool = False) -> Optional[Dict]:
+        """Rebuild the view, unless nothing was loaded since the last build"""
+        async with self.lock:
+            generation = self.data_loader.generation
+            if not force:
+                if generation == self.built_generation:
+                    return None
+                if generation == 0:
+                    # Nothing loaded since startup; adopt the view a previous process built
+                    completed = await self.db[ENRICHED_VIEW_STATE_COLLECTION].find_one({'_id': 'build'})
+                    if completed is not None:
+                        self.built_generation = generation
+                        self.view_build = completed['build']
+                        return None
+            
+            started = time.monotonic()
+            written = 0
+            build = str(uuid.uuid4())
+            self.built_generation = None
+            await self.db[ENRICHED_VIEW_STATE_COLLECTION].delete_one({'_id': 'build'})
+            
+            async def write_batch(documents, source):
+                nonlocal written
+                writes = []
+                # Enriched in a worker thread, a batch at a time
+                for document, enriched in zip(documents, await self.enrichment.enrich_company_batch(documents, source)):
+                    enriched['_id'] = document['_id']
+                    enriched['_build'] = build
+                    writes.append(ReplaceOne({'_id': document['_id']}, enriched, upsert=True))
+                if writes:
+                    await self.db[ENRICHED_VIEW_COLLECTION].bulk_write(writes, ordered=False)
+                    written += len(writes)
+            
+            for collection_name, source in ENRICHED_VIEW_SOURCES:
+                batch = []
+                async for document in self.db[collection_name].find({}).batch_size(VIEW_WRITE_BATCH_SIZE):
+                    batch.append(document)
+                    if len(batch) >= VIEW_WRITE_BATCH_SIZE:
+                        await write_batch(batch, source)
+                        batch = []
+                await write_batch(batch, source)
+            
+            # Records of companies that no longer exist
+            removed = await self.db[ENRICHED_VIEW_COLLECTION].delete_many({'_build': {'$ne': build}})
+            await self.db[ENRICHED_VIEW_STATE_COLLECTION].replace_one(
+                {'_id': 'build'}, {'_id': 'build', 'build': build, 'generation': generation}, upsert=True
+            )
+            
+            self.built_generation = generation
+            self.view_build = build
+            self.last_report = {
+                'generation': generation,
+                'build': build,
+                'companies': written,
+                'removed': removed.deleted_count,
+                'seconds': round(time.monotonic() - started, 3),
+            }
+            logger.info(f"Enriched company view rebuilt: {self.last_report}")
+            return self.last_report
+    
+    def stats(self) -> Dict:
+        """Whether the view is current, and the last rebuild"""
+        return {
+            'current': self.current_build() is not None,
+            'build': self.view_build,
+            'last_build': self.last_report,
+        }
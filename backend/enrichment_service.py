@@ -1,10 +1,17 @@
 """
 Enrichment Service - Combines data from multiple sources to provide comprehensive enrichment
 """
+import asyncio
+import base64
+import binascii
+import functools
 import logging
-from typing import List, Dict, Optional
+import os
+import time
+from typing import Any, AsyncIterator, Iterable, List, Dict, Optional, Tuple
 import re
 import math
+from bson import json_util
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
 logger = logging.getLogger(__name__)
@@ -27,9 +34,407 @@ def clean_json_data(data):
     else:
         return data
 
+def strip_document_id(document: Dict) -> Dict:
+    """
+    Drop the _id of a stored enriched record before serving it. Stored records were
+    sanitized at load time, so unlike clean_json_data this does not walk or copy them.
+    """
+    document.pop('_id', None)
+    return document
+
+# Seconds each source collection gets to answer a search before its results are dropped
+SEARCH_SOURCE_TIMEOUT = float(os.environ.get('SEARCH_SOURCE_TIMEOUT', 2.0))
+
+# Source collections searched, with the source name used to enrich their documents
+# (None for enriched_data, which already holds enriched Apollo records)
+SEARCH_SOURCES = [
+    ('enriched_data', None),
+    ('crunchbase_companies', 'crunchbase'),
+    ('linkedin_companies', 'linkedin'),
+]
+
+# Golden company records merged from every source by entity_resolution; already enriched
+RESOLVED_SEARCH_SOURCES = [
+    ('companies_resolved', None),
+]
+
+# Materialized enriched records of the Crunchbase and LinkedIn companies (see enriched_view)
+ENRICHED_VIEW_COLLECTION = 'enriched_companies'
+
+# Streamed searches: documents per Mongo batch, and enriched records buffered between the
+# source cursors and the response
+STREAM_BATCH_SIZE = int(os.environ.get('SEARCH_STREAM_BATCH_SIZE', 100))
+STREAM_BUFFER_SIZE = int(os.environ.get('SEARCH_STREAM_BUFFER_SIZE', 500))
+
+# Order of ranked ('text') search results, best $text match first. The score is projected
+# under this name to sort on it.
+TEXT_SCORE_SORT = [('_text_score', {'$meta': 'textScore'})]
+
+# Order of paginated search pages, and their keyset. Search filters are $or clauses and
+# unanchored regexes over several fields, which no index walks in any useful order, so each
+# page is a top-`limit` sort of the matches whatever the key; _id is unique and never
+# changes, so it alone makes a complete keyset.
+SEARCH_PAGE_SORT = [('_id', 1)]
+
+# Data sources of the Apollo CSV rows stored in enriched_data
+APOLLO_DATA_SOURCES = ['apollo_csv', 'apollo_csv_companies']
+
+# Fields each source collection matches a search query against
+SEARCH_QUERY_FIELDS = {
+    'enriched_data': ['company_name', 'website', 'enrichment_fields.company_name', 'all_prospects.name'],
+    'crunchbase_companies': ['name', 'about', 'website'],
+    'linkedin_companies': ['name', 'description', 'url'],
+}
+
+# Long free-text fields among them. These have no ascending index (a regex over one would
+# scan every key), so they are always matched through the collection's text index: a query
+# finds whole (stemmed) words in them, and a substring of a word in the other fields.
+SEARCH_FREE_TEXT_FIELDS = {
+    'crunchbase_companies': ['about'],
+    'linkedin_companies': ['description'],
+}
+
+# The fields a query is matched against by substring regex (and that the in-process
+# search index covers)
+SEARCH_SUBSTRING_FIELDS = {
+    collection: [field for field in fields if field not in SEARCH_FREE_TEXT_FIELDS.get(collection, [])]
+    for collection, fields in SEARCH_QUERY_FIELDS.items()
+}
+
+# Enrichment batches at least this large are run in a worker thread
+ENRICH_THREAD_MIN_BATCH = int(os.environ.get('ENRICH_THREAD_MIN_BATCH', 200))
+
+URL_PREFIX_PATTERN = re.compile(r'https?://(www\.)?')
+
+@functools.lru_cache(maxsize=65536)
+def extract_domain(url: str) -> Optional[str]:
+    """Domain of a website URL (memoized, many contacts share a company's domain)"""
+    try:
+        if not url:
+            return None
+        # Remove protocol and www, then keep just the domain part
+        return URL_PREFIX_PATTERN.sub('', url).split('/')[0]
+    except Exception:
+        return None
+
+def build_query_clauses(collection: str, query: str, candidate_ids: Optional[List] = None) -> List[Dict]:
+    """
+    The $or clauses matching a search query against a collection: a regex on each
+    substring field and a $text clause for the free-text fields. With candidate_ids
+    from the in-process search index, the regexes are only re-checked on those
+    documents. Either way a query matches the same documents (every clause of the $or
+    is indexed, as $text requires).
+    """
+    clauses = [{field: {'$regex': query, '$options': 'i'}} for field in SEARCH_SUBSTRING_FIELDS[collection]]
+    if candidate_ids is not None:
+        clauses = [{'_id': {'$in': candidate_ids}, '$or': clauses}]
+    if SEARCH_FREE_TEXT_FIELDS.get(collection):
+        clauses.append({'$text': {'$search': query}})
+    return clauses
+
+def build_employee_filter(min_employees: int = None, max_employees: int = None) -> Dict:
+    """
+    Filter on the employees_min/employees_max range computed at load time: a company
+    matches if its range overlaps [min_employees, max_employees]. An open-ended range
+    ("10001+") has no employees_max; companies of unknown size never match.
+    """
+    if min_employees is None and max_employees is None:
+        return {}
+    
+    # Comparing against a number also excludes documents whose employees_min is null
+    employees_min = {'$gte': 0}
+    if max_employees is not None:
+        employees_min['$lte'] = max_employees
+    employee_filter = {'employees_min': employees_min}
+    
+    if min_employees is not None:
+        employee_filter['$and'] = [{'$or': [
+            {'employees_max': {'$gte': min_employees}},
+            {'employees_max': None},
+        ]}]
+    return employee_filter
+
+def build_search_filters(query: str = None, industry: str = None, location: str = None,
+                         candidate_ids: Optional[Dict[str, List]] = None, mode: str = 'regex',
+                         min_employees: int = None, max_employees: int = None) -> Dict[str, Dict]:
+    """
+    Build the MongoDB filter issued against each source collection for a search.
+    These are the query shapes the index plan in data_loader is derived from.
+    In 'text' mode the query is matched with the collections' $text index instead of
+    regexes, and the location filter narrows the matches rather than adding to them.
+    """
+    candidate_ids = candidate_ids or {}
+    text_filter = {'$text': {'$search': query}} if query and mode == 'text' else {}
+    if text_filter:
+        query = None
+    
+    # Apollo CSV data (new enriched data)
+    apollo_filter = dict(text_filter)
+    if query:
+        apollo_filter['$or'] = build_query_clauses('enriched_data', query, candidate_ids.get('enriched_data'))
+    
+    if industry:
+        apollo_filter['industry'] = {'$regex': industry, '$options': 'i'}
+    
+    if location:
+        apollo_filter['$or'] = apollo_filter.get('$or', []) + [
+            {'location': {'$regex': location, '$options': 'i'}},
+        ]
+    
+    # Crunchbase data
+    crunchbase_filter = dict(text_filter)
+    if query:
+        # Case-insensitive regex search on name or website, text search on about
+        crunchbase_filter['$or'] = build_query_clauses(
+            'crunchbase_companies', query, candidate_ids.get('crunchbase_companies')
+        )
+    
+    if industry:
+        crunchbase_filter['industries.value'] = {'$regex': industry, '$options': 'i'}
+    
+    if location:
+        crunchbase_filter['$or'] = crunchbase_filter.get('$or', []) + [
+            {'region': {'$regex': location, '$options': 'i'}},
+            {'address': {'$regex': location, '$options': 'i'}},
+            {'country_code': {'$regex': location, '$options': 'i'}}
+        ]
+    
+    # LinkedIn data
+    linkedin_filter = dict(text_filter)
+    if query:
+        linkedin_filter['$or'] = build_query_clauses(
+            'linkedin_companies', query, candidate_ids.get('linkedin_companies')
+        )
+    
+    if industry:
+        linkedin_filter['industries'] = {'$regex': industry, '$options': 'i'}
+    
+    if location:
+        linkedin_filter['$or'] = linkedin_filter.get('$or', []) + [
+            {'city': {'$regex': location, '$options': 'i'}},
+            {'state': {'$regex': location, '$options': 'i'}},
+            {'country': {'$regex': location, '$options': 'i'}}
+        ]
+    
+    employee_filter = build_employee_filter(min_employees, max_employees)
+    
+    return {
+        'enriched_data': {'data_source': {'$in': APOLLO_DATA_SOURCES}, **apollo_filter, **employee_filter},
+        'crunchbase_companies': {**crunchbase_filter, **employee_filter},
+        'linkedin_companies': {**linkedin_filter, **employee_filter},
+    }
+
+# Output fields a search can select, with the source document fields each one is computed
+# from. company_name is always returned since results are deduplicated on it.
+SEARCH_FIELD_SOURCES = {
+    'email': {'crunchbase': ['contact_email', 'contacts.name', 'website']},
+    'linkedin': {'crunchbase': ['social_media_links', 'contacts.linkedin_id'], 'linkedin': ['url']},
+    'contact_number': {'crunchbase': ['contact_phone']},
+    'company_name': {'crunchbase': ['name', 'legal_name'], 'linkedin': ['name']},
+    'prospect_full_name': {'crunchbase': ['contacts', 'current_employees.name', 'current_employees.title',
+                                          'current_employees.permalink']},
+    'website': {'crunchbase': ['website', 'url'], 'linkedin': ['website', 'url']},
+    'industry': {'crunchbase': ['industries'], 'linkedin': ['industries']},
+    'location': {'crunchbase': ['address'], 'linkedin': ['city', 'state', 'country']},
+    'employee_count': {'crunchbase': ['num_employees'], 'linkedin': ['employee_count', 'company_size']},
+    'description': {'crunchbase': ['about', 'description'], 'linkedin': ['about', 'description']},
+    'founded_date': {'crunchbase': ['founded_date'], 'linkedin': ['founded_date']},
+    'social_media': {'crunchbase': ['social_media_links'], 'linkedin': ['social_media_links']},
+    'funding': {'crunchbase': ['funding']},
+    'cb_rank': {'crunchbase': ['cb_rank']},
+    'operating_status': {'crunchbase': ['operating_status']},
+    'founders': {'crunchbase': ['founders']},
+    'company_size': {'linkedin': ['company_size']},
+    'specialities': {'linkedin': ['specialities']},
+    'follower_count': {'linkedin': ['follower_count']},
+    'address': {'linkedin': ['address']},
+    'zip_code': {'linkedin': ['zip_code']},
+    'company_details': {},
+}
+SEARCH_FIELDS = list(SEARCH_FIELD_SOURCES)
+
+# Keys of an enriched record holding each output field (Apollo rows are stored enriched)
+SEARCH_FIELD_KEYS = {
+    'email': ['enrichment_fields.email', 'all_emails'],
+    'linkedin': ['enrichment_fields.linkedin', 'all_linkedin_profiles'],
+    'contact_number': ['enrichment_fields.contact_number', 'all_contact_numbers'],
+    'company_name': ['enrichment_fields.company_name', 'company_name'],
+    'prospect_full_name': ['enrichment_fields.prospect_full_name', 'all_prospects'],
+}
+
+def resolve_search_fields(fields: Optional[Iterable[str]] = None) -> set:
+    """The output fields to compute: the requested ones plus company_name, or all of them"""
+    if fields is None:
+        return set(SEARCH_FIELDS)
+    unknown = set(fields) - set(SEARCH_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown search fields: {', '.join(sorted(unknown))}")
+    return set(fields) | {'company_name'}
+
+def _projection(paths: Iterable[str]) -> Dict[str, int]:
+    """Inclusion projection for paths, dropping paths inside another included path"""
+    paths = sorted(set(paths))
+    kept = [path for path in paths if not any(path.startswith(f"{parent}.") for parent in paths)]
+    return {path: 1 for path in kept}
+
+def build_search_projections(fields: Optional[Iterable[str]] = None,
+                             sources: List[Tuple[str, Optional[str]]] = SEARCH_SOURCES) -> Dict[str, Optional[Dict]]:
+    """
+    The projection each source collection is queried with for a field selection, or
+    None per collection (whole documents) when no fields are selected
+    """
+    if fields is None:
+        return {collection_name: None for collection_name, _ in sources}
+    wanted = resolve_search_fields(fields)
+    projections = {}
+    for collection_name, source in sources:
+        if source is None:
+            paths = ['data_source'] + [key for field in wanted for key in SEARCH_FIELD_KEYS.get(field, [field])]
+        else:
+            paths = [path for field in wanted for path in SEARCH_FIELD_SOURCES[field].get(source, [])]
+        projections[collection_name] = _projection(paths)
+    return projections
+
+def encode_search_cursor(positions: Dict[str, Dict]) -> str:
+    """
+    Opaque page token holding each source's keyset position: {'after': last _id}
+    or {'done': True} once the source is exhausted
+    """
+    return base64.urlsafe_b64encode(json_util.dumps(positions).encode()).decode()
+
+def decode_search_cursor(token: str) -> Dict[str, Dict]:
+    """Inverse of encode_search_cursor; raises ValueError for a malformed token"""
+    try:
+        positions = json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid search cursor: {str(e)}")
+    if not isinstance(positions, dict) or not all(isinstance(p, dict) for p in positions.values()):
+        raise ValueError("Invalid search cursor")
+    return positions
+
+def build_resolved_filters(query: str = None, industry: str = None, location: str = None, mode: str = 'regex',
+                           min_employees: int = None, max_employees: int = None) -> Dict[str, Dict]:
+    """
+    Build the MongoDB filter for a search of the golden records in companies_resolved,
+    matching on their merged and normalized fields
+    """
+    resolved_filter = {}
+    if query and mode == 'text':
+        resolved_filter['$text'] = {'$search': query}
+    elif query:
+        resolved_filter['$or'] = [
+            {'company_name': {'$regex': query, '$options': 'i'}},
+            {'domain': {'$regex': query, '$options': 'i'}},
+            # Free text, through the text index
+            {'$text': {'$search': query}},
+        ]
+    
+    if industry:
+        resolved_filter['facet_industries'] = {'$regex': industry, '$options': 'i'}
+    
+    if location:
+        resolved_filter['$or'] = resolved_filter.get('$or', []) + [
+            {'location': {'$regex': location, '$options': 'i'}},
+            {'facet_country': {'$regex': location, '$options': 'i'}},
+        ]
+    
+    return {'companies_resolved': {**resolved_filter, **build_employee_filter(min_employees, max_employees)}}
+
+def build_jobs_filter(company_id: str = None, company_name: str = None, company_ids: Optional[List[str]] = None) -> Dict:
+    """
+    Build the MongoDB filter issued against linkedin_jobs for a company's jobs. A name
+    is looked up as the company_ids it resolves to (see hiring.HiringSummaries), or
+    matched exactly when it resolves to none.
+    """
+    query = {}
+    if company_id:
+        query['company_id'] = company_id
+    elif company_ids:
+        query['company_id'] = {'$in': company_ids}
+    elif company_name:
+        query['company_name'] = company_name
+    return query
+
+# Job posting fields left out of job search results unless descriptions are requested
+JOB_SEARCH_EXCLUDED_FIELDS = ['_data_source', '_loaded_at', '_content_hash']
+JOB_DESCRIPTION_FIELDS = ['description', 'skills_desc']
+
+# Largest page (or stream) a job search returns
+JOB_SEARCH_MAX_LIMIT = int(os.environ.get('JOB_SEARCH_MAX_LIMIT', 500))
+
+def build_job_search_filter(query: str = None, location: str = None, work_type: str = None,
+                            min_salary: float = None, max_salary: float = None,
+                            posted_within_days: int = None) -> Dict:
+    """
+    Build the MongoDB filter issued against linkedin_jobs for a job postings search.
+    query is matched against titles and descriptions with the text index; salaries
+    are compared with normalized_salary (annualized) and posting dates with
+    listed_time (epoch milliseconds).
+    """
+    query_filter = {}
+    if query:
+        query_filter['$text'] = {'$search': query}
+    
+    if location:
+        query_filter['location'] = {'$regex': location, '$options': 'i'}
+    
+    if work_type:
+        # work_type holds codes like FULL_TIME; "full-time" and "Full time" match too
+        query_filter['work_type'] = re.sub(r'[\s-]+', '_', work_type.strip()).upper()
+    
+    if min_salary is not None or max_salary is not None:
+        salary = {}
+        if min_salary is not None:
+            salary['$gte'] = min_salary
+        if max_salary is not None:
+            salary['$lte'] = max_salary
+        query_filter['normalized_salary'] = salary
+    
+    if posted_within_days is not None:
+        query_filter['listed_time'] = {'$gte': (time.time() - posted_within_days * 86400) * 1000}
+    
+    return query_filter
+
+# Order of job search results: newest postings first, _id breaking ties. It is the keyset
+# of job search pages, and the job search indexes in data_loader.INDEX_PLAN end in it.
+JOB_SEARCH_SORT = [('listed_time', -1), ('_id', -1)]
+
+def build_job_search_after(position: Dict) -> Dict:
+    """
+    Filter for the postings after a keyset position ({'listed_time': ..., 'after': _id})
+    in JOB_SEARCH_SORT order. Postings without a listed_time sort last.
+    """
+    listed_time, after = position['listed_time'], position['after']
+    if listed_time is None:
+        return {'$or': [{'listed_time': None, '_id': {'$lt': after}}]}
+    return {'$or': [
+        {'listed_time': {'$lt': listed_time}},
+        {'listed_time': listed_time, '_id': {'$lt': after}},
+        {'listed_time': None},
+    ]}
+
+def decode_job_search_cursor(token: str) -> Dict[str, Dict]:
+    """decode_search_cursor for job search pages, which also carry the listed_time keyset value"""
+    positions = decode_search_cursor(token)
+    position = positions.get('linkedin_jobs', {})
+    if 'after' in position and 'listed_time' not in position:
+        raise ValueError("Invalid search cursor")
+    return positions
+
+def build_job_search_projection(include_description: bool = False) -> Dict:
+    """Projection of job search results"""
+    excluded = JOB_SEARCH_EXCLUDED_FIELDS + ([] if include_description else JOB_DESCRIPTION_FIELDS)
+    return {field: 0 for field in excluded}
+
 class EnrichmentService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, search_index=None, enriched_view=None, hiring_summaries=None):
         self.db = db
+        # Optional in-process CompanySearchIndex that narrows query regexes to candidate _ids
+        self.search_index = search_index
+        # Optional EnrichedCompanyView serving precomputed enriched records of search hits
+        self.enriched_view = enriched_view
+        # Optional HiringSummaries resolving company names to company_ids for job lookups
+        self.hiring_summaries = hiring_summaries
     
     async def search_companies(self, 
                                query: str = None,
@@ -37,97 +442,93 @@ class EnrichmentService:
                                location: str = None,
                                min_employees: int = None,
                                max_employees: int = None,
-                               limit: int = 50) -> List[Dict]:
+                               limit: int = 50,
+                               source_timeouts: Optional[Dict[str, float]] = None,
+                               mode: str = 'regex',
+                               fields: Optional[List[str]] = None,
+                               paginate: bool = False,
+                               cursor: Optional[Dict[str, Dict]] = None,
+                               resolved: bool = False) -> Dict:
         """
-        Search companies across all data sources with multiple filters
+        Search companies across all data sources with multiple filters.
+        The sources are queried concurrently, each with its own deadline (seconds, by
+        collection name, defaulting to SEARCH_SOURCE_TIMEOUT). Sources that miss their
+        deadline are left out and listed in timed_out_sources, sources whose query failed
+        in failed_sources. partial is set when either is non-empty or the search itself
+        failed.
+        
+        mode='text' ranks matches by relevance: each source returns its best `limit`
+        $text matches, scores are normalized per source (best match = 1.0) and the
+        sources are merged by that score.
+        
+        fields (see SEARCH_FIELDS) limits the output to those fields; only the source
+        document fields they are computed from are fetched.
+        
+        With paginate (or a decoded cursor from a previous page), each source is read in
+        _id order (SEARCH_PAGE_SORT) from its keyset position, and next_cursor resumes after this page
+        (None once every source is exhausted). Not supported for ranked ('text')
+        searches. Crunchbase and LinkedIn loads upsert in place and keep _ids, so their
+        pages stay stable while data is reloaded. Apollo pages do not:
+        load_apollo_csv deletes and re-inserts every row, giving each a new, larger
+        _id, so a cursor open across an Apollo import reads that source again from
+        the start. Golden records keyed by an Apollo member move the same way.
+        
+        With resolved, the golden records of companies_resolved are searched instead of
+        the individual sources.
         """
         try:
             results = []
-            
-            # Search in Apollo CSV data (new enriched data)
-            apollo_filter = {}
-            if query:
-                apollo_filter['$or'] = [
-                    {'company_name': {'$regex': query, '$options': 'i'}},
-                    {'website': {'$regex': query, '$options': 'i'}},
-                    {'enrichment_fields.company_name': {'$regex': query, '$options': 'i'}},
-                    {'all_prospects.name': {'$regex': query, '$options': 'i'}},
-                ]
-            
-            if industry:
-                apollo_filter['industry'] = {'$regex': industry, '$options': 'i'}
-            
-            if location:
-                apollo_filter['$or'] = apollo_filter.get('$or', []) + [
-                    {'location': {'$regex': location, '$options': 'i'}},
-                ]
-            
-            # Query enriched_data collection for Apollo CSV data
-            apollo_data = await self.db.enriched_data.find(
-                {'data_source': {'$in': ['apollo_csv', 'apollo_csv_companies']}, **apollo_filter}
-            ).limit(limit // 3).to_list(length=limit // 3)
-            
-            # Apollo CSV data is already in enriched format, clean ObjectId and add to results
-            for item in apollo_data:
-                cleaned_item = clean_json_data(item)
-                results.append(cleaned_item)
-            
-            # Search in Crunchbase data
-            crunchbase_filter = {}
-            if query:
-                # Case-insensitive regex search on name, about, or website
-                crunchbase_filter['$or'] = [
-                    {'name': {'$regex': query, '$options': 'i'}},
-                    {'about': {'$regex': query, '$options': 'i'}},
-                    {'website': {'$regex': query, '$options': 'i'}}
-                ]
-            
-            if industry:
-                crunchbase_filter['industries.value'] = {'$regex': industry, '$options': 'i'}
-            
-            if location:
-                crunchbase_filter['$or'] = crunchbase_filter.get('$or', []) + [
-                    {'region': {'$regex': location, '$options': 'i'}},
-                    {'address': {'$regex': location, '$options': 'i'}},
-                    {'country_code': {'$regex': location, '$options': 'i'}}
-                ]
-            
-            crunchbase_companies = await self.db.crunchbase_companies.find(
-                crunchbase_filter
-            ).limit(limit // 3).to_list(length=limit // 3)
-            
-            # Process Crunchbase results
-            for company in crunchbase_companies:
-                enriched = await self.enrich_company_data(company, 'crunchbase')
-                results.append(enriched)
-            
-            # Search in LinkedIn data
-            linkedin_filter = {}
-            if query:
-                linkedin_filter['$or'] = [
-                    {'name': {'$regex': query, '$options': 'i'}},
-                    {'description': {'$regex': query, '$options': 'i'}},
-                    {'url': {'$regex': query, '$options': 'i'}}
-                ]
-            
-            if industry:
-                linkedin_filter['industries'] = {'$regex': industry, '$options': 'i'}
-            
-            if location:
-                linkedin_filter['$or'] = linkedin_filter.get('$or', []) + [
-                    {'city': {'$regex': location, '$options': 'i'}},
-                    {'state': {'$regex': location, '$options': 'i'}},
-                    {'country': {'$regex': location, '$options': 'i'}}
-                ]
-            
-            linkedin_companies = await self.db.linkedin_companies.find(
-                linkedin_filter
-            ).limit(limit // 3).to_list(length=limit // 3)
-            
-            # Process LinkedIn results
-            for company in linkedin_companies:
-                enriched = await self.enrich_company_data(company, 'linkedin')
-                results.append(enriched)
+            timed_out_sources = []
+            failed_sources = []
+            source_timeouts = source_timeouts or {}
+            ranked = mode == 'text' and bool(query)
+            paginated = paginate or cursor is not None
+            positions = dict(cursor or {})
+            
+            sources, filters, projections = await self._plan_search(
+                query, industry, location, min_employees, max_employees, mode, fields, resolved
+            )
+            source_limit = limit if ranked else limit // len(sources)
+            if paginated:
+                source_limit = max(source_limit, 1)
+            
+            async def no_results():
+                return [], None, True
+            
+            searches = []
+            for collection_name, source in sources:
+                position = positions.get(collection_name, {})
+                if position.get('done'):
+                    searches.append(no_results())
+                    continue
+                query_filter = filters[collection_name]
+                if 'after' in position:
+                    query_filter = {**query_filter, '_id': {'$gt': position['after']}}
+                searches.append(asyncio.wait_for(
+                    self._search_source(collection_name, query_filter, source, source_limit, ranked,
+                                        projections[collection_name], fields, sort_by_id=paginated),
+                    timeout=source_timeouts.get(collection_name, SEARCH_SOURCE_TIMEOUT)
+                ))
+            outcomes = await asyncio.gather(*searches, return_exceptions=True)
+            
+            for (collection_name, _), outcome in zip(sources, outcomes):
+                # A source that missed its deadline or failed keeps its position for the next page
+                if isinstance(outcome, asyncio.TimeoutError):
+                    logger.warning(f"Search of {collection_name} missed its deadline")
+                    timed_out_sources.append(collection_name)
+                elif isinstance(outcome, Exception):
+                    logger.error(f"Error searching {collection_name}: {str(outcome)}")
+                    failed_sources.append(collection_name)
+                else:
+                    source_results, last_id, exhausted = outcome
+                    results.extend(source_results)
+                    if exhausted:
+                        positions[collection_name] = {'done': True}
+                    elif last_id is not None:
+                        positions[collection_name] = {'after': last_id}
+            
+            if ranked:
+                results.sort(key=lambda result: result['relevance'], reverse=True)
             
             # Remove duplicates based on company name
             seen_names = set()
@@ -138,13 +539,200 @@ class EnrichmentService:
                     seen_names.add(name_lower)
                     unique_results.append(result)
             
-            return unique_results[:limit]
-            
+            response = {
+                'results': unique_results[:limit],
+                'timed_out_sources': timed_out_sources,
+                'failed_sources': failed_sources,
+                'partial': bool(timed_out_sources or failed_sources),
+            }
+            if paginated:
+                all_done = all(positions.get(name, {}).get('done') for name, _ in sources)
+                response['next_cursor'] = None if all_done else encode_search_cursor(positions)
+            return response
+        
         except Exception as e:
             logger.error(f"Error in search_companies: {str(e)}")
+            return {'results': [], 'timed_out_sources': [], 'failed_sources': [], 'partial': True}
+    
+    async def stream_companies(self,
+                               query: str = None,
+                               industry: str = None,
+                               location: str = None,
+                               min_employees: int = None,
+                               max_employees: int = None,
+                               limit: int = 50,
+                               fields: Optional[List[str]] = None,
+                               resolved: bool = False) -> AsyncIterator[Dict]:
+        """
+        Search like search_companies, but yield enriched records as each source's Mongo
+        batches arrive instead of collecting them first. Each batch is read from the
+        enriched view when it is current, or enriched in one go. The sources are read
+        concurrently into a bounded buffer and deduplicated on company name as records
+        are yielded, so memory stays bounded whatever the limit.
+        """
+        sources, filters, projections = await self._plan_search(
+            query, industry, location, min_employees, max_employees, 'regex', fields, resolved
+        )
+        buffer = asyncio.Queue(maxsize=STREAM_BUFFER_SIZE)
+        source_done = object()
+        
+        async def put_batch(collection_name, source, documents, view_build):
+            for result in await self._enrich_hits(collection_name, documents, source, fields, view_build):
+                if result is not None:
+                    await buffer.put(result)
+        
+        async def read_source(collection_name, source):
+            view_build = self._view_build(source)
+            # Only the hits' _ids are needed when their enriched records come from the view
+            projection = {'_id': 1} if view_build is not None else projections[collection_name]
+            cursor = self.db[collection_name].find(
+                filters[collection_name], projection
+            ).limit(limit // len(sources)).batch_size(STREAM_BATCH_SIZE)
+            try:
+                # Enriched a Mongo batch at a time
+                batch = []
+                async for document in cursor:
+                    batch.append(document)
+                    if len(batch) >= STREAM_BATCH_SIZE:
+                        await put_batch(collection_name, source, batch, view_build)
+                        batch = []
+                if batch:
+                    await put_batch(collection_name, source, batch, view_build)
+            except Exception as e:
+                logger.error(f"Error streaming {collection_name}: {str(e)}")
+            finally:
+                await cursor.close()
+            # Not sent when cancelled: nobody drains the buffer any more, so a put could block forever
+            await buffer.put(source_done)
+        
+        readers = [asyncio.create_task(read_source(name, source)) for name, source in sources]
+        try:
+            seen_names = set()
+            remaining = len(readers)
+            while remaining:
+                result = await buffer.get()
+                if result is source_done:
+                    remaining -= 1
+                    continue
+                
+                # Remove duplicates based on company name
+                name_lower = (result.get('company_name') or '').lower()
+                if name_lower and name_lower not in seen_names:
+                    seen_names.add(name_lower)
+                    yield result
+                    if len(seen_names) >= limit:
+                        break
+        finally:
+            # Stop reading once the limit is reached or the client goes away
+            for reader in readers:
+                reader.cancel()
+            await asyncio.gather(*readers, return_exceptions=True)
+    
+    async def _plan_search(self, query, industry, location, min_employees, max_employees, mode, fields, resolved):
+        """The collections a search reads, with the filter and projection for each"""
+        if resolved:
+            sources = RESOLVED_SEARCH_SOURCES
+            filters = build_resolved_filters(query, industry, location, mode, min_employees, max_employees)
+        else:
+            sources = SEARCH_SOURCES
+            candidate_ids = None
+            if self.search_index and query and mode != 'text':
+                candidate_ids = await self.search_index.lookup(query)
+            filters = build_search_filters(query, industry, location, candidate_ids, mode=mode,
+                                           min_employees=min_employees, max_employees=max_employees)
+        projections = build_search_projections(fields, sources)
+        if resolved and projections['companies_resolved'] is None:
+            # Bookkeeping of the resolution run that wrote the record
+            projections['companies_resolved'] = {'_resolution_run': 0}
+        return sources, filters, projections
+    
+    async def _search_source(self, collection_name: str, query_filter: Dict, source: Optional[str],
+                             limit: int, ranked: bool = False, projection: Optional[Dict] = None,
+                             fields: Optional[List[str]] = None, sort_by_id: bool = False) -> Tuple[List[Dict], Any, bool]:
+        """
+        Query one source collection and enrich its documents. Ranked ($text) queries are
+        sorted by text score, and each result carries its score relative to the best one.
+        Returns the results, the _id of the last document read and whether the source
+        returned fewer documents than the limit (i.e. is exhausted).
+        """
+        view_build = self._view_build(source)
+        if view_build is not None:
+            # Only the hits' _ids are needed; their enriched records come from the view
+            projection = {'_id': 1}
+        
+        if ranked:
+            projection = {**(projection or {}), **dict(TEXT_SCORE_SORT)}
+            cursor = self.db[collection_name].find(query_filter, projection).sort(TEXT_SCORE_SORT)
+        else:
+            cursor = self.db[collection_name].find(query_filter, projection)
+            if sort_by_id:
+                cursor = cursor.sort(SEARCH_PAGE_SORT)
+        documents = await cursor.limit(limit).to_list(length=limit)
+        last_id = documents[-1]['_id'] if documents else None
+        exhausted = len(documents) < limit
+        
+        scores = [document.pop('_text_score', 0) for document in documents]
+        results = await self._enrich_hits(collection_name, documents, source, fields, view_build)
+        
+        if ranked:
+            best_score = max(scores, default=0) or 1
+            for result, document_score in zip(results, scores):
+                if result is not None:
+                    result['relevance'] = round(document_score / best_score, 4)
+        return [result for result in results if result is not None], last_id, exhausted
+    
+    def _view_build(self, source: Optional[str]) -> Optional[str]:
+        """The enriched view build to read a source's records from, or None to enrich live"""
+        if source is None or self.enriched_view is None:
+            return None
+        return self.enriched_view.current_build()
+    
+    async def _enrich_hits(self, collection_name: str, documents: List[Dict], source: Optional[str],
+                           fields: Optional[List[str]], view_build: Optional[str]) -> List[Optional[Dict]]:
+        """
+        Enriched records of a batch of search hits, aligned with documents: read from the
+        enriched view when view_build is set, otherwise enriched in one batch
+        """
+        if source is None:
+            # Apollo CSV data is already in enriched format
+            return [strip_document_id(document) for document in documents]
+        if view_build is not None:
+            return await self._read_enriched_view(
+                collection_name, [document['_id'] for document in documents], source, fields, view_build
+            )
+        return await self.enrich_company_batch(documents, source, fields)
+    
+    async def _read_enriched_view(self, collection_name: str, ids: List, source: str,
+                                  fields: Optional[List[str]], view_build: str) -> List[Optional[Dict]]:
+        """
+        Enriched records of the given source documents from the materialized view,
+        aligned with ids. Documents the view does not hold for this build are enriched
+        live; those deleted from the source meanwhile are None.
+        """
+        if not ids:
             return []
+        if fields is None:
+            projection = {'_build': 0}
+        else:
+            wanted = resolve_search_fields(fields)
+            projection = _projection(
+                ['data_source'] + [key for field in wanted for key in SEARCH_FIELD_KEYS.get(field, [field])]
+            )
+        records = {}
+        async for record in self.db[ENRICHED_VIEW_COLLECTION].find(
+            {'_id': {'$in': ids}, '_build': view_build}, projection
+        ):
+            records[record.pop('_id')] = record
+        
+        missing = [_id for _id in ids if _id not in records]
+        if missing:
+            projection = build_search_projections(fields, [(collection_name, source)])[collection_name]
+            documents = await self.db[collection_name].find({'_id': {'$in': missing}}, projection).to_list(length=None)
+            for document, record in zip(documents, await self.enrich_company_batch(documents, source, fields)):
+                records[document['_id']] = record
+        return [records.get(_id) for _id in ids]
     
-    async def enrich_company_data(self, company: Dict, source: str) -> Dict:
+    async def enrich_company_data(self, company: Dict, source: str, fields: Optional[Iterable[str]] = None) -> Dict:
         """
         Enrich company data by extracting and normalizing fields in order:
         1. Email
@@ -152,145 +740,150 @@ class EnrichmentService:
         3. Contact Number
         4. Company Name
         5. Prospect Full Name
+        
+        With fields (see SEARCH_FIELDS), only those output fields are computed.
         """
-        try:
-            enriched = {
-                'data_source': source,
-                'enrichment_fields': {}
-            }
-            
-            # 1. Email extraction
-            emails = []
-            if source == 'crunchbase':
-                if company.get('contact_email'):
-                    emails.append(company['contact_email'])
-                
-                # Extract emails from contacts
-                contacts = company.get('contacts', [])
-                for contact in contacts:
-                    if contact.get('name'):
-                        # Generate potential email from name and domain
-                        name = contact['name'].lower().replace(' ', '.')
-                        if company.get('website'):
-                            domain = self._extract_domain(company['website'])
-                            if domain:
-                                emails.append(f"{name}@{domain}")
-            
-            enriched['enrichment_fields']['email'] = emails[0] if emails else None
-            enriched['all_emails'] = list(set(emails))  # Remove duplicates
-            
-            # 2. LinkedIn extraction
-            linkedin_profiles = []
-            if source == 'crunchbase':
-                social_links = company.get('social_media_links', [])
-                for link in social_links:
-                    if 'linkedin.com' in link:
-                        linkedin_profiles.append(link)
-                
-                # Extract LinkedIn IDs from contacts
-                contacts = company.get('contacts', [])
-                for contact in contacts:
-                    linkedin_id = contact.get('linkedin_id')
-                    if linkedin_id:
-                        linkedin_profiles.append(f"https://www.linkedin.com/in/{linkedin_id}")
-            
-            elif source == 'linkedin':
-                if company.get('url'):
-                    linkedin_profiles.append(company['url'])
-            
-            enriched['enrichment_fields']['linkedin'] = linkedin_profiles[0] if linkedin_profiles else None
-            enriched['all_linkedin_profiles'] = list(set(linkedin_profiles))
-            
-            # 3. Contact Number
-            contact_numbers = []
-            if source == 'crunchbase':
-                if company.get('contact_phone'):
-                    contact_numbers.append(company['contact_phone'])
-            
-            enriched['enrichment_fields']['contact_number'] = contact_numbers[0] if contact_numbers else None
-            enriched['all_contact_numbers'] = contact_numbers
-            
-            # 4. Company Name
-            company_name = None
-            if source == 'crunchbase':
-                company_name = company.get('name') or company.get('legal_name')
-            elif source == 'linkedin':
-                company_name = company.get('name')
-            
-            enriched['enrichment_fields']['company_name'] = company_name
-            enriched['company_name'] = company_name
-            
-            # 5. Prospect Full Name
-            prospect_names = []
-            if source == 'crunchbase':
-                # Extract from contacts
-                contacts = company.get('contacts', [])
-                for contact in contacts:
-                    if contact.get('name'):
-                        prospect_names.append({
-                            'name': contact['name'],
-                            'title': contact.get('job_title'),
-                            'linkedin_id': contact.get('linkedin_id'),
-                            'departments': contact.get('departments', [])
-                        })
-                
-                # Extract from current_employees
-                employees = company.get('current_employees', [])
-                for emp in employees:
+        return self.enrich_companies([company], source, fields)[0]
+    
+    async def enrich_company_batch(self, companies: List[Dict], source: str,
+                                   fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """enrich_companies, run in a worker thread for batches large enough to stall the event loop"""
+        if len(companies) >= ENRICH_THREAD_MIN_BATCH:
+            return await asyncio.to_thread(self.enrich_companies, companies, source, fields)
+        return self.enrich_companies(companies, source, fields)
+    
+    def enrich_companies(self, companies: List[Dict], source: str, fields: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Enrich a batch of raw source documents (see enrich_company_data). Synchronous and
+        free of I/O, so large batches can run in a worker thread. A document that fails
+        to enrich gives {'error': ...} in its place.
+        """
+        wanted = resolve_search_fields(fields)
+        enriched = []
+        for company in companies:
+            try:
+                enriched.append(self._enrich_company(company, source, wanted))
+            except Exception as e:
+                logger.error(f"Error enriching company data: {str(e)}")
+                enriched.append({'error': str(e)})
+        return enriched
+    
+    def _enrich_company(self, company: Dict, source: str, wanted: set) -> Dict:
+        """Enrich one document, reading its contacts and employees in a single pass each"""
+        enriched = {
+            'data_source': source,
+            'enrichment_fields': {}
+        }
+        
+        emails = []
+        linkedin_profiles = []
+        contact_numbers = []
+        prospect_names = []
+        
+        if source == 'crunchbase':
+            if company.get('contact_email'):
+                emails.append(company['contact_email'])
+            if company.get('contact_phone'):
+                contact_numbers.append(company['contact_phone'])
+            
+            for link in company.get('social_media_links', []):
+                if 'linkedin.com' in link:
+                    linkedin_profiles.append(link)
+            
+            # Potential emails are generated from contact names and the company's domain
+            website = company.get('website')
+            domain = extract_domain(website) if website and isinstance(website, str) else None
+            for contact in company.get('contacts', []):
+                name = contact.get('name')
+                if name:
+                    if domain:
+                        emails.append(f"{name.lower().replace(' ', '.')}@{domain}")
+                    prospect_names.append({
+                        'name': name,
+                        'title': contact.get('job_title'),
+                        'linkedin_id': contact.get('linkedin_id'),
+                        'departments': contact.get('departments', [])
+                    })
+                linkedin_id = contact.get('linkedin_id')
+                if linkedin_id:
+                    linkedin_profiles.append(f"https://www.linkedin.com/in/{linkedin_id}")
+            
+            if 'prospect_full_name' in wanted:
+                for emp in company.get('current_employees', []):
                     if emp.get('name'):
                         prospect_names.append({
                             'name': emp['name'],
                             'title': emp.get('title'),
                             'permalink': emp.get('permalink')
                         })
-            
+        
+        elif source == 'linkedin':
+            if company.get('url'):
+                linkedin_profiles.append(company['url'])
+        
+        # 1. Email
+        if 'email' in wanted:
+            enriched['enrichment_fields']['email'] = emails[0] if emails else None
+            enriched['all_emails'] = list(set(emails))  # Remove duplicates
+        
+        # 2. LinkedIn
+        if 'linkedin' in wanted:
+            enriched['enrichment_fields']['linkedin'] = linkedin_profiles[0] if linkedin_profiles else None
+            enriched['all_linkedin_profiles'] = list(set(linkedin_profiles))
+        
+        # 3. Contact Number
+        if 'contact_number' in wanted:
+            enriched['enrichment_fields']['contact_number'] = contact_numbers[0] if contact_numbers else None
+            enriched['all_contact_numbers'] = contact_numbers
+        
+        # 4. Company Name (always computed, results are deduplicated on it)
+        company_name = None
+        if source == 'crunchbase':
+            company_name = company.get('name') or company.get('legal_name')
+        elif source == 'linkedin':
+            company_name = company.get('name')
+        
+        enriched['enrichment_fields']['company_name'] = company_name
+        enriched['company_name'] = company_name
+        
+        # 5. Prospect Full Name
+        if 'prospect_full_name' in wanted:
             enriched['enrichment_fields']['prospect_full_name'] = prospect_names[0]['name'] if prospect_names else None
             enriched['all_prospects'] = prospect_names
-            
-            # Additional enrichment fields
+        
+        # Additional enrichment fields
+        if 'website' in wanted:
             enriched['website'] = company.get('website') or company.get('url')
+        if 'industry' in wanted:
             enriched['industry'] = self._extract_industry(company, source)
+        if 'location' in wanted:
             enriched['location'] = self._extract_location(company, source)
+        if 'employee_count' in wanted:
             enriched['employee_count'] = self._extract_employee_count(company, source)
+        if 'description' in wanted:
             enriched['description'] = company.get('about') or company.get('description')
+        if 'founded_date' in wanted:
             enriched['founded_date'] = company.get('founded_date')
+        if 'social_media' in wanted:
             enriched['social_media'] = company.get('social_media_links', [])
-            
-            # Additional fields from source
-            if source == 'crunchbase':
-                enriched['funding'] = company.get('funding')
-                enriched['cb_rank'] = company.get('cb_rank')
-                enriched['operating_status'] = company.get('operating_status')
+        
+        # Additional fields from source
+        if source == 'crunchbase':
+            for field in ('funding', 'cb_rank', 'operating_status'):
+                if field in wanted:
+                    enriched[field] = company.get(field)
+            if 'founders' in wanted:
                 enriched['founders'] = company.get('founders', [])
-            
-            elif source == 'linkedin':
-                enriched['company_size'] = company.get('company_size')
+        
+        elif source == 'linkedin':
+            for field in ('company_size', 'follower_count', 'address', 'zip_code'):
+                if field in wanted:
+                    enriched[field] = company.get(field)
+            if 'specialities' in wanted:
                 enriched['specialities'] = company.get('specialities', [])
-                enriched['follower_count'] = company.get('follower_count')
-                enriched['address'] = company.get('address')
-                enriched['zip_code'] = company.get('zip_code')
-            
-            # Sanitize all float values to prevent JSON serialization errors
-            enriched = self._sanitize_data(enriched)
-            
-            return enriched
-            
-        except Exception as e:
-            logger.error(f"Error enriching company data: {str(e)}")
-            return {'error': str(e)}
-    
-    def _extract_domain(self, url: str) -> Optional[str]:
-        """Extract domain from URL"""
-        try:
-            if not url:
-                return None
-            # Remove protocol and www
-            domain = re.sub(r'https?://(www\.)?', '', url)
-            # Get just the domain part
-            domain = domain.split('/')[0]
-            return domain
-        except:
-            return None
+        
+        # Source documents are sanitized when loaded (see data_loader.sanitize_value)
+        return enriched
     
     def _extract_industry(self, company: Dict, source: str) -> Optional[str]:
         """Extract industry information"""
@@ -328,14 +921,64 @@ class EnrichmentService:
             return str(emp_count) if emp_count else company.get('company_size')
         return None
     
+    async def search_jobs(self,
+                          query: str = None,
+                          location: str = None,
+                          work_type: str = None,
+                          min_salary: float = None,
+                          max_salary: float = None,
+                          posted_within_days: int = None,
+                          limit: int = 50,
+                          cursor: Optional[Dict[str, Dict]] = None,
+                          include_description: bool = False) -> Dict:
+        """
+        Search job postings across companies. Postings are read newest first
+        (JOB_SEARCH_SORT) from the keyset position of cursor (a decoded next_cursor),
+        and next_cursor resumes after this page (None once the matches are exhausted).
+        """
+        query_filter = build_job_search_filter(query, location, work_type, min_salary, max_salary, posted_within_days)
+        position = (cursor or {}).get('linkedin_jobs', {})
+        if position.get('done'):
+            return {'results': [], 'next_cursor': None}
+        if 'after' in position:
+            query_filter.update(build_job_search_after(position))
+        
+        jobs = await self.db.linkedin_jobs.find(
+            query_filter, build_job_search_projection(include_description)
+        ).sort(JOB_SEARCH_SORT).limit(limit).to_list(length=limit)
+        
+        next_cursor = None
+        if len(jobs) == limit:
+            last = jobs[-1]
+            next_cursor = encode_search_cursor(
+                {'linkedin_jobs': {'listed_time': last.get('listed_time'), 'after': last['_id']}}
+            )
+        return {'results': [strip_document_id(job) for job in jobs], 'next_cursor': next_cursor}
+    
+    async def stream_jobs(self,
+                          query: str = None,
+                          location: str = None,
+                          work_type: str = None,
+                          min_salary: float = None,
+                          max_salary: float = None,
+                          posted_within_days: int = None,
+                          limit: int = 50,
+                          include_description: bool = False) -> AsyncIterator[Dict]:
+        """Search like search_jobs, but yield postings as the Mongo batches arrive"""
+        query_filter = build_job_search_filter(query, location, work_type, min_salary, max_salary, posted_within_days)
+        cursor = self.db.linkedin_jobs.find(
+            query_filter, build_job_search_projection(include_description)
+        ).sort(JOB_SEARCH_SORT).limit(limit).batch_size(STREAM_BATCH_SIZE)
+        async for job in cursor:
+            yield strip_document_id(job)
+    
     async def get_company_jobs(self, company_id: str = None, company_name: str = None) -> List[Dict]:
         """Get job postings for a company"""
         try:
-            query = {}
-            if company_id:
-                query['company_id'] = company_id
-            elif company_name:
-                query['company_name'] = {'$regex': company_name, '$options': 'i'}
+            company_ids = None
+            if company_name and not company_id and self.hiring_summaries:
+                company_ids = await self.hiring_summaries.company_ids(company_name)
+            query = build_jobs_filter(company_id, company_name, company_ids)
             
             jobs = await self.db.linkedin_jobs.find(query).to_list(length=100)
             
@@ -348,20 +991,7 @@ class EnrichmentService:
                 cleaned_jobs.append(job)
             
             return cleaned_jobs
-            
+        
         except Exception as e:
             logger.error(f"Error getting company jobs: {str(e)}")
             return []
-    
-    def _sanitize_data(self, data):
-        """Sanitize data to prevent JSON serialization errors with NaN/Infinity values"""
-        if isinstance(data, dict):
-            return {k: self._sanitize_data(v) for k, v in data.items()}
-        elif isinstance(data, list):
-            return [self._sanitize_data(item) for item in data]
-        elif isinstance(data, float):
-            if math.isnan(data) or math.isinf(data):
-                return None
-            return data
-        else:
-            return data
@@ -0,0 +1,381 @@
+"""
+Entity Resolution - Merges the Crunchbase, LinkedIn and Apollo records of one company into a golden record
+"""
+import asyncio
+import itertools
+import logging
+import os
+import re
+import time
+import uuid
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from countries import country_code
+from employee_ranges import employee_bucket
+from enrichment_service import APOLLO_DATA_SOURCES, EnrichmentService, clean_json_data
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_COLLECTION = 'companies_resolved'
+
+# Collections resolved, with the source name used to enrich their documents. Earlier
+# collections win when the records of a company disagree.
+RESOLUTION_SOURCES = [
+    ('crunchbase_companies', 'crunchbase'),
+    ('linkedin_companies', 'linkedin'),
+    ('enriched_data', None),
+]
+
+# Fields read in the first pass, to block and score records
+KEY_FIELDS = {
+    'crunchbase_companies': ['name', 'legal_name', 'website', 'social_media_links', 'country_code'],
+    'linkedin_companies': ['name', 'website', 'url', 'country'],
+    'enriched_data': ['company_name', 'website', 'company_details.linkedin_url', 'company_details.country', 'location'],
+}
+
+# Pairs scoring at least this much are the same company. An exact normalized name on its
+# own reaches it, unless the domains, LinkedIn pages or countries contradict it.
+MATCH_THRESHOLD = 0.7
+
+# Subtracted when both records' countries are recognised (ISO codes) and differ: namesakes in
+# different countries are usually different companies, unless a domain or LinkedIn page
+# (worth more than the penalty) says otherwise
+COUNTRY_MISMATCH_PENALTY = 0.3
+
+# Blocks larger than this (e.g. every Apollo person at one company) are compared against
+# their first record only, instead of pairwise
+MAX_BLOCK_SIZE = int(os.environ.get('RESOLUTION_MAX_BLOCK_SIZE', 50))
+
+WRITE_BATCH_SIZE = 1000
+
+# Source documents enriched together in a worker thread during the merge pass
+ENRICH_BATCH_SIZE = int(os.environ.get('RESOLUTION_ENRICH_BATCH_SIZE', 1000))
+
+# Trailing tokens that do not distinguish one company from another
+LEGAL_SUFFIXES = {
+    'inc', 'incorporated', 'llc', 'ltd', 'limited', 'corp', 'corporation', 'co', 'company',
+    'plc', 'gmbh', 'ag', 'sa', 'sas', 'srl', 'bv', 'nv', 'pty', 'pvt', 'lp', 'llp', 'group', 'holdings',
+}
+
+# Hosts of profile links, which never identify a company's own domain
+SOCIAL_DOMAINS = ('linkedin.com', 'facebook.com', 'twitter.com', 'x.com', 'instagram.com', 'crunchbase.com')
+
+LINKEDIN_COMPANY_PATTERN = re.compile(r'linkedin\.com/company/([^/?#\s]+)', re.IGNORECASE)
+NON_ALPHANUMERIC = re.compile(r'[^0-9a-z]+')
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Lowercase alphanumeric tokens without trailing legal suffixes ("Apple Inc." -> "apple")"""
+    if not isinstance(name, str):
+        return None
+    tokens = NON_ALPHANUMERIC.sub(' ', name.lower().replace('&', ' and ')).split()
+    # Dotted abbreviations split into single letters ("N.V." -> "n v"); join them back
+    joined = []
+    for single, group in itertools.groupby(tokens, key=lambda token: len(token) == 1):
+        joined.extend([''.join(group)] if single else group)
+    tokens = joined
+    while len(tokens) > 1 and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return ' '.join(tokens) or None
+
+def normalize_domain(url: Optional[str]) -> Optional[str]:
+    """Registered host of a company website, without scheme, www. or path"""
+    if not isinstance(url, str) or not url.strip():
+        return None
+    url = url.strip().lower()
+    host = urlparse(url if '://' in url else f"http://{url}").hostname
+    if not host or '.' not in host:
+        return None
+    if host.startswith('www.'):
+        host = host[4:]
+    if any(host == domain or host.endswith(f".{domain}") for domain in SOCIAL_DOMAINS):
+        return None
+    return host
+
+def linkedin_slug(url: Optional[str]) -> Optional[str]:
+    """Company identifier of a LinkedIn company page URL"""
+    if not isinstance(url, str):
+        return None
+    match = LINKEDIN_COMPANY_PATTERN.search(url)
+    return match.group(1).lower().rstrip('/') if match else None
+
+def normalize_country(value: Optional[str], allow_codes: bool = True) -> Optional[str]:
+    """
+    ISO 3166-1 alpha-2 code of a country name or code, or None if the value is not a
+    recognised country (see countries.country_code)
+    """
+    return country_code(value, allow_codes=allow_codes)
+
+def key_record(collection_name: str, document: Dict) -> Dict:
+    """The normalized identity of a source document, used for blocking and scoring"""
+    if collection_name == 'crunchbase_companies':
+        links = document.get('social_media_links') or []
+        return {
+            'name': normalize_name(document.get('name') or document.get('legal_name')),
+            'domain': normalize_domain(document.get('website')),
+            'linkedin': next((slug for slug in map(linkedin_slug, links) if slug), None),
+            'country': normalize_country(document.get('country_code')),
+        }
+    if collection_name == 'linkedin_companies':
+        return {
+            'name': normalize_name(document.get('name')),
+            'domain': normalize_domain(document.get('website')),
+            'linkedin': linkedin_slug(document.get('url')),
+            'country': normalize_country(document.get('country')),
+        }
+    details = document.get('company_details') or {}
+    country = normalize_country(details.get('country'))
+    location = document.get('location')
+    if country is None and isinstance(location, str):
+        # The last part of a location is a country only when it is spelled out; a short
+        # token there is usually a US state ("San Francisco, CA")
+        country = normalize_country(location.split(',')[-1], allow_codes=False)
+    return {
+        'name': normalize_name(document.get('company_name')),
+        'domain': normalize_domain(document.get('website')),
+        'linkedin': linkedin_slug(details.get('linkedin_url')),
+        'country': country,
+    }
+
+def blocking_keys(key: Dict) -> List[str]:
+    """Records sharing any of these keys are compared with each other"""
+    keys = []
+    if key['domain']:
+        keys.append(f"d:{key['domain']}")
+    if key['linkedin']:
+        keys.append(f"l:{key['linkedin']}")
+    if key['name']:
+        keys.append(f"n:{key['name']}")
+    return keys
+
+def match_score(a: Dict, b: Dict) -> float:
+    """Evidence that two records describe the same company; >= MATCH_THRESHOLD is a match"""
+    score = 0.0
+    if a['name'] and b['name']:
+        score += 0.7 * SequenceMatcher(None, a['name'], b['name']).ratio()
+    for field, weight in (('domain', 0.5), ('linkedin', 0.6)):
+        if a[field] and b[field]:
+            score += weight if a[field] == b[field] else -0.5
+    if a['country'] and b['country'] and a['country'] != b['country']:
+        score -= COUNTRY_MISMATCH_PENALTY
+    return score
+
+class UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+    
+    def find(self, item: int) -> int:
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+    
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # The lower index (higher priority source) stays the root
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+def resolve_clusters(keys: List[Dict]) -> List[int]:
+    """Cluster root of every record: block, score pairs within blocks, union the matches"""
+    blocks = defaultdict(list)
+    for index, key in enumerate(keys):
+        for block_key in blocking_keys(key):
+            blocks[block_key].append(index)
+    
+    clusters = UnionFind(len(keys))
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        if len(members) > MAX_BLOCK_SIZE:
+            pairs = ((members[0], other) for other in members[1:])
+        else:
+            pairs = ((a, b) for position, a in enumerate(members) for b in members[position + 1:])
+        for a, b in pairs:
+            if clusters.find(a) != clusters.find(b) and match_score(keys[a], keys[b]) >= MATCH_THRESHOLD:
+                clusters.union(a, b)
+    return [clusters.find(index) for index in range(len(keys))]
+
+def _is_empty(value) -> bool:
+    return value is None or value == '' or value == [] or value == {}
+
+def _union(values: Iterable) -> List:
+    """Concatenate without duplicates, keeping order (values may be unhashable dicts)"""
+    seen, merged = set(), []
+    for value in values:
+        marker = repr(value)
+        if marker not in seen:
+            seen.add(marker)
+            merged.append(value)
+    return merged
+
+def merge_golden(parts: List[Dict], keys: List[Dict]) -> Dict:
+    """
+    Merge the enriched records of one company (highest priority first): scalars take
+    the first non-empty value, lists are unioned, and facet fields are normalized
+    """
+    golden = {'enrichment_fields': {}}
+    for part in parts:
+        for field, value in part.items():
+            if field == 'enrichment_fields':
+                for name, enriched_value in (value or {}).items():
+                    if _is_empty(golden['enrichment_fields'].get(name)):
+                        golden['enrichment_fields'][name] = enriched_value
+            elif isinstance(value, list):
+                golden[field] = _union((golden.get(field) or []) + value)
+            elif _is_empty(golden.get(field)):
+                golden[field] = value
+    
+    industries = set()
+    for part in parts:
+        for industry in (part.get('industry') or '').split(','):
+            if industry.strip():
+                industries.add(industry.strip().lower())
+    
+    # The size range comes from a single source, never a mix of two
+    sized = next((part for part in parts if part.get('employees_min') is not None), {})
+    golden['employees_min'] = sized.get('employees_min')
+    golden['employees_max'] = sized.get('employees_max')
+    
+    golden['data_source'] = 'resolved'
+    golden['data_sources'] = sorted({part['data_source'] for part in parts if part.get('data_source')})
+    golden['company_name_normalized'] = next((key['name'] for key in keys if key['name']), None)
+    golden['domain'] = next((key['domain'] for key in keys if key['domain']), None)
+    golden['linkedin_slug'] = next((key['linkedin'] for key in keys if key['linkedin']), None)
+    golden['facet_industries'] = sorted(industries)
+    golden['facet_country'] = next((key['country'] for key in keys if key['country']), None)
+    golden['facet_size_bucket'] = employee_bucket(golden.get('employees_min'))
+    return golden
+
+class EntityResolver:
+    """
+    Batch entity resolution over the source collections, writing one golden record per
+    company to companies_resolved. Runs after each load that changed data.
+    
+    Pass 1 reads only identity fields, blocks records on normalized domain, LinkedIn page
+    and normalized name, scores pairs within each block and clusters matches with
+    union-find. Pass 2 streams full documents, enriches them in batches on a worker
+    thread (so a resolution run does not stall the API) and writes each cluster's
+    golden record as soon as all of its members have been seen.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase, data_loader=None):
+        self.db = db
+        self.data_loader = data_loader
+        self.enrichment = EnrichmentService(db)
+        self.resolved_generation = None
+        self.lock = asyncio.Lock()
+    
+    def _source_filter(self, collection_name: str) -> Dict:
+        return {'data_source': {'$in': APOLLO_DATA_SOURCES}} if collection_name == 'enriched_data' else {}
+    
+    async def run(self, force: bool = False) -> Optional[Dict]:
+        """Resolve every company, unless nothing was loaded since the last run"""
+        async with self.lock:
+            generation = self.data_loader.generation if self.data_loader else None
+            if not force and generation is not None:
+                if generation == self.resolved_generation:
+                    return None
+                # Nothing loaded since startup, and a previous process already resolved
+                if generation == 0 and await self.db[RESOLVED_COLLECTION].estimated_document_count() > 0:
+                    self.resolved_generation = generation
+                    return None
+            
+            started = time.monotonic()
+            
+            # Pass 1: identities
+            members, keys = [], []
+            for collection_number, (collection_name, _) in enumerate(RESOLUTION_SOURCES):
+                projection = {field: 1 for field in KEY_FIELDS[collection_name]}
+                async for document in self.db[collection_name].find(self._source_filter(collection_name), projection):
+                    members.append((collection_number, document['_id']))
+                    keys.append(key_record(collection_name, document))
+            
+            roots = await asyncio.to_thread(resolve_clusters, keys)
+            cluster_sizes = Counter(roots)
+            member_index = {member: index for index, member in enumerate(members)}
+            logger.info(f"Resolved {len(keys)} source records into {len(cluster_sizes)} companies")
+            
+            # Pass 2: merge and write golden records
+            run_id = uuid.uuid4().hex
+            pending = defaultdict(list)
+            writes = []
+            written = 0
+            
+            async def flush():
+                nonlocal writes, written
+                if writes:
+                    await self.db[RESOLVED_COLLECTION].bulk_write(writes, ordered=False)
+                    written += len(writes)
+                    writes = []
+            
+            async def merge_batch(collection_name, source, batch):
+                """Enrich a batch of (member index, document) off the event loop and queue finished clusters"""
+                documents = [document for _, document in batch]
+                if source is None:
+                    parts = await asyncio.to_thread(lambda: [clean_json_data(document) for document in documents])
+                else:
+                    parts = await self.enrichment.enrich_company_batch(documents, source)
+                    for document, part in zip(documents, parts):
+                        part['employees_min'] = document.get('employees_min')
+                        part['employees_max'] = document.get('employees_max')
+                
+                for (index, document), part in zip(batch, parts):
+                    root = roots[index]
+                    pending[root].append((index, collection_name, document['_id'], part))
+                    if len(pending[root]) == cluster_sizes[root]:
+                        writes.append(self._golden_write(pending.pop(root), keys, run_id))
+                        if len(writes) >= WRITE_BATCH_SIZE:
+                            await flush()
+            
+            for collection_number, (collection_name, source) in enumerate(RESOLUTION_SOURCES):
+                batch = []
+                cursor = self.db[collection_name].find(self._source_filter(collection_name)).batch_size(ENRICH_BATCH_SIZE)
+                async for document in cursor:
+                    index = member_index.get((collection_number, document['_id']))
+                    if index is None:
+                        # Written after pass 1; picked up by the next run
+                        continue
+                    batch.append((index, document))
+                    if len(batch) >= ENRICH_BATCH_SIZE:
+                        await merge_batch(collection_name, source, batch)
+                        batch = []
+                if batch:
+                    await merge_batch(collection_name, source, batch)
+            
+            # Members removed between the passes leave clusters incomplete
+            for cluster in pending.values():
+                writes.append(self._golden_write(cluster, keys, run_id))
+            await flush()
+            
+            # Golden records of companies that no longer exist (or merged differently)
+            removed = await self.db[RESOLVED_COLLECTION].delete_many({'_resolution_run': {'$ne': run_id}})
+            
+            if self.data_loader:
+                # Search results read from companies_resolved just changed
+                self.data_loader.generation += 1
+                self.resolved_generation = self.data_loader.generation
+            
+            report = {
+                'source_records': len(keys),
+                'companies': written,
+                'merged_clusters': sum(1 for size in cluster_sizes.values() if size > 1),
+                'removed': removed.deleted_count,
+                'seconds': round(time.monotonic() - started, 3),
+            }
+            logger.info(f"Entity resolution finished: {report}")
+            return report
+    
+    def _golden_write(self, cluster: List[Tuple[int, str, object, Dict]], keys: List[Dict], run_id: str) -> ReplaceOne:
+        """Golden record of a cluster, keyed by its highest priority member"""
+        cluster.sort(key=lambda member: member[0])
+        golden = merge_golden([part for _, _, _, part in cluster], [keys[index] for index, _, _, _ in cluster])
+        golden['sources'] = [{'collection': collection_name, 'id': str(_id)} for _, collection_name, _id, _ in cluster]
+        golden['_resolution_run'] = run_id
+        _, collection_name, _id, _ = cluster[0]
+        golden_id = f"{collection_name}:{_id}"
+        return ReplaceOne({'_id': golden_id}, {'_id': golden_id, **golden}, upsert=True)
@@ -0,0 +1,109 @@
+"""
+Facets - Company counts per industry, country, size bucket and data source
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from enrichment_service import build_resolved_filters
+from search_cache import SearchCache, normalize_search_value
+
+logger = logging.getLogger(__name__)
+
+FACET_TABLES_COLLECTION = 'facet_tables'
+
+# Facets over the golden records in companies_resolved, and whether the field is a list
+FACET_FIELDS = {
+    'industry': ('facet_industries', True),
+    'country': ('facet_country', False),
+    'size_bucket': ('facet_size_bucket', False),
+    'data_source': ('data_sources', True),
+}
+
+# Values returned per facet, most frequent first
+FACET_LIMIT = 50
+
+def build_facet_pipeline(match: Optional[Dict] = None) -> List[Dict]:
+    """One $facet aggregation counting every facet (and the total) for the matched companies"""
+    facets = {'total': [{'$count': 'count'}]}
+    for name, (field, is_list) in FACET_FIELDS.items():
+        stages = [{'$unwind': f"${field}"}] if is_list else []
+        stages += [
+            {'$match': {field: {'$ne': None}}},
+            {'$group': {'_id': f"${field}", 'count': {'$sum': 1}}},
+            {'$sort': {'count': -1, '_id': 1}},
+            {'$limit': FACET_LIMIT},
+        ]
+        facets[name] = stages
+    return ([{'$match': match}] if match else []) + [{'$facet': facets}]
+
+def shape_facet_result(result: Dict) -> Dict:
+    """{'total': n, 'facets': {facet: [{'value', 'count'}]}} from a $facet result document"""
+    total = result.get('total') or [{'count': 0}]
+    return {
+        'total': total[0]['count'],
+        'facets': {
+            name: [{'value': bucket['_id'], 'count': bucket['count']} for bucket in result.get(name, [])]
+            for name in FACET_FIELDS
+        },
+    }
+
+class FacetService:
+    """
+    Facet counts for a search's filters. Filtered requests run a $facet aggregation over
+    the matching golden records; the unfiltered breakdown is precomputed after each
+    load into facet_tables. Both are cached per data generation.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase, data_loader):
+        self.db = db
+        self.data_loader = data_loader
+        self.cache = SearchCache()
+        self.precomputed_generation = None
+        self.lock = asyncio.Lock()
+    
+    async def _aggregate(self, match: Optional[Dict] = None) -> Dict:
+        results = await self.db.companies_resolved.aggregate(build_facet_pipeline(match)).to_list(length=1)
+        return shape_facet_result(results[0] if results else {})
+    
+    async def precompute(self):
+        """Store the unfiltered facet counts, unless nothing was loaded since the last run"""
+        async with self.lock:
+            generation = self.data_loader.generation
+            if generation == self.precomputed_generation:
+                return
+            if generation == 0 and await self.db[FACET_TABLES_COLLECTION].count_documents({'_id': 'all'}, limit=1):
+                # Nothing loaded since startup; the stored table is current
+                self.precomputed_generation = generation
+                return
+            
+            table = await self._aggregate()
+            table['computed_at'] = datetime.now(timezone.utc).isoformat()
+            await self.db[FACET_TABLES_COLLECTION].replace_one({'_id': 'all'}, {'_id': 'all', **table}, upsert=True)
+            self.precomputed_generation = generation
+            self.cache.clear()
+            logger.info(f"Precomputed facet counts over {table['total']} companies")
+    
+    async def _unfiltered(self) -> Dict:
+        table = await self.db[FACET_TABLES_COLLECTION].find_one({'_id': 'all'})
+        if table is None:
+            return await self._aggregate()
+        return {'total': table['total'], 'facets': table['facets'], 'computed_at': table.get('computed_at')}
+    
+    async def facets(self, query: str = None, industry: str = None, location: str = None,
+                     min_employees: int = None, max_employees: int = None) -> Dict:
+        """Facet counts for the companies matching a search's filters"""
+        match = build_resolved_filters(
+            query, industry, location, min_employees=min_employees, max_employees=max_employees
+        )['companies_resolved']
+        key = (
+            normalize_search_value(query),
+            normalize_search_value(industry),
+            normalize_search_value(location),
+            min_employees,
+            max_employees,
+        )
+        compute = (lambda: self._aggregate(match)) if match else self._unfiltered
+        return await self.cache.get_or_compute(key, self.data_loader.generation, compute)
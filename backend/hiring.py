@@ -0,0 +1,164 @@
+"""
+Hiring - Company name to company_id resolution for job lookups, and pre-aggregated hiring summaries
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne
+
+from entity_resolution import normalize_name
+
+logger = logging.getLogger(__name__)
+
+COMPANY_NAME_IDS_COLLECTION = 'company_name_ids'
+HIRING_SUMMARY_COLLECTION = 'company_hiring_summary'
+
+# Titles and locations kept per hiring summary
+SUMMARY_TOP_TITLES = 10
+SUMMARY_TOP_LOCATIONS = 10
+
+# Name resolution entries written per bulk_write
+NAME_WRITE_BATCH_SIZE = int(os.environ.get('COMPANY_NAME_WRITE_BATCH_SIZE', 1000))
+
+def build_hiring_summary_pipeline(run_id: str) -> List[Dict]:
+    """
+    Aggregation over linkedin_jobs writing one summary per company_id into
+    company_hiring_summary: postings and open roles (not closed), the most frequent
+    titles, the locations hired in and the latest posting date
+    """
+    return [
+        {'$match': {'company_id': {'$ne': None}}},
+        # One group per (company, title) to rank titles by postings
+        {'$group': {
+            '_id': {'company_id': '$company_id', 'title': '$title'},
+            'company_name': {'$first': '$company_name'},
+            'postings': {'$sum': 1},
+            'open_roles': {'$sum': {'$cond': [{'$eq': [{'$ifNull': ['$closed_time', None]}, None]}, 1, 0]}},
+            'locations': {'$addToSet': '$location'},
+            'latest_listed_time': {'$max': '$listed_time'},
+        }},
+        {'$sort': {'postings': -1, '_id.title': 1}},
+        {'$group': {
+            '_id': '$_id.company_id',
+            'company_name': {'$first': '$company_name'},
+            'postings': {'$sum': '$postings'},
+            'open_roles': {'$sum': '$open_roles'},
+            'titles': {'$push': {'title': '$_id.title', 'postings': '$postings'}},
+            'locations': {'$push': '$locations'},
+            'latest_listed_time': {'$max': '$latest_listed_time'},
+        }},
+        {'$project': {
+            'company_id': '$_id',
+            'company_name': 1,
+            'postings': 1,
+            'open_roles': 1,
+            'top_titles': {'$slice': [
+                {'$filter': {'input': '$titles', 'cond': {'$ne': ['$$this.title', None]}}}, SUMMARY_TOP_TITLES
+            ]},
+            'locations': {'$slice': [
+                {'$filter': {
+                    'input': {'$reduce': {'input': '$locations', 'initialValue': [], 'in': {'$setUnion': ['$$value', '$$this']}}},
+                    'cond': {'$ne': ['$$this', None]},
+                }},
+                SUMMARY_TOP_LOCATIONS,
+            ]},
+            # listed_time is epoch milliseconds
+            'latest_posting': {'$toDate': '$latest_listed_time'},
+            '_summary_run': run_id,
+        }},
+        {'$merge': {'into': HIRING_SUMMARY_COLLECTION, 'on': '_id', 'whenMatched': 'replace', 'whenNotMatched': 'insert'}},
+    ]
+
+class HiringSummaries:
+    """
+    Builds, after each load, the normalized company name -> company_id table that job
+    lookups by name resolve through (so they seek the company_id index instead of
+    scanning linkedin_jobs with a regex), and the per-company hiring summaries.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase, data_loader=None):
+        self.db = db
+        self.data_loader = data_loader
+        self.built_generation = None
+        self.lock = asyncio.Lock()
+    
+    async def run(self, force: bool = False) -> Optional[Dict]:
+        """Rebuild both tables, unless nothing was loaded since the last run"""
+        async with self.lock:
+            generation = self.data_loader.generation if self.data_loader else None
+            if not force and generation is not None:
+                if generation == self.built_generation:
+                    return None
+                # Nothing loaded since startup, and a previous process already built them
+                if generation == 0 and await self.db[COMPANY_NAME_IDS_COLLECTION].estimated_document_count() > 0:
+                    self.built_generation = generation
+                    return None
+            
+            started = time.monotonic()
+            run_id = uuid.uuid4().hex
+            names = await self._build_name_ids(run_id)
+            
+            await self.db.linkedin_jobs.aggregate(build_hiring_summary_pipeline(run_id)).to_list(length=None)
+            removed = await self.db[HIRING_SUMMARY_COLLECTION].delete_many({'_summary_run': {'$ne': run_id}})
+            
+            self.built_generation = generation
+            report = {
+                'names': names,
+                'summaries': await self.db[HIRING_SUMMARY_COLLECTION].estimated_document_count(),
+                'removed_summaries': removed.deleted_count,
+                'seconds': round(time.monotonic() - started, 3),
+            }
+            logger.info(f"Hiring summaries built: {report}")
+            return report
+    
+    async def _build_name_ids(self, run_id: str) -> int:
+        """Write the company_ids of every normalized company name from the companies and job postings"""
+        company_ids = defaultdict(set)
+        async for company in self.db.linkedin_companies.find({'company_id': {'$ne': None}}, {'company_id': 1, 'name': 1}):
+            name = normalize_name(company.get('name'))
+            if name:
+                company_ids[name].add(company['company_id'])
+        # Postings name their company too, also for companies missing from companies.csv
+        async for pair in self.db.linkedin_jobs.aggregate([
+            {'$match': {'company_id': {'$ne': None}}},
+            {'$group': {'_id': {'company_id': '$company_id', 'company_name': '$company_name'}}},
+        ]):
+            name = normalize_name(pair['_id'].get('company_name'))
+            if name:
+                company_ids[name].add(pair['_id']['company_id'])
+        
+        writes = []
+        for name, ids in company_ids.items():
+            writes.append(ReplaceOne(
+                {'_id': name}, {'_id': name, 'company_ids': sorted(ids), '_name_run': run_id}, upsert=True
+            ))
+            if len(writes) >= NAME_WRITE_BATCH_SIZE:
+                await self.db[COMPANY_NAME_IDS_COLLECTION].bulk_write(writes, ordered=False)
+                writes = []
+        if writes:
+            await self.db[COMPANY_NAME_IDS_COLLECTION].bulk_write(writes, ordered=False)
+        await self.db[COMPANY_NAME_IDS_COLLECTION].delete_many({'_name_run': {'$ne': run_id}})
+        return len(company_ids)
+    
+    async def company_ids(self, company_name: str) -> List[str]:
+        """company_ids of the companies whose normalized name matches company_name"""
+        name = normalize_name(company_name)
+        if not name:
+            return []
+        entry = await self.db[COMPANY_NAME_IDS_COLLECTION].find_one({'_id': name})
+        return entry['company_ids'] if entry else []
+    
+    async def summaries(self, company_id: str = None, company_name: str = None) -> List[Dict]:
+        """Hiring summaries of a company, by company_id or by (normalized) name"""
+        company_ids = [company_id] if company_id else await self.company_ids(company_name)
+        if not company_ids:
+            return []
+        summaries = await self.db[HIRING_SUMMARY_COLLECTION].find(
+            {'_id': {'$in': company_ids}}, {'_id': 0, '_summary_run': 0}
+        ).to_list(length=len(company_ids))
+        return sorted(summaries, key=lambda summary: summary['postings'], reverse=True)
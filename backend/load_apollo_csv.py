@@ -2,9 +2,12 @@ import pandas as pd
 import os
 from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
+import argparse
 import asyncio
 from pathlib import Path
 
+from employee_ranges import add_employee_range
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -14,88 +17,106 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-async def load_apollo_people_data():
-    """Load Apollo people data from CSV"""
-    print("Loading Apollo people data...")
-    
-    # Read the CSV
-    df = pd.read_csv('apollo_people_data.csv')
-    
-    # Convert to records
-    records = []
-    for _, row in df.iterrows():
-        record = {
+# Rows read per CSV chunk and documents per insert_many batch
+CHUNK_SIZE = 50000
+BATCH_SIZE = 5000
+
+def _text_column(df, name):
+    """A CSV column as a list of values, with missing cells (or a missing column) as ''"""
+    if name not in df:
+        return [''] * len(df)
+    return df[name].astype(object).where(df[name].notna(), '').tolist()
+
+def _count_column(df, name):
+    """An employee count column as strings, without float artefacts like '250.0'"""
+    if name not in df:
+        return [''] * len(df)
+    numeric = pd.to_numeric(df[name], errors='coerce')
+    as_text = df[name].astype(object).where(df[name].notna(), '').astype(str)
+    is_integral = numeric.notna() & (numeric % 1 == 0)
+    return as_text.mask(is_integral, numeric.where(is_integral).astype('Int64').astype(str)).tolist()
+
+def _location_column(df, *names):
+    """Join location parts column-wise into 'City, State, Country'"""
+    parts = [pd.Series(_text_column(df, name), index=df.index).astype(str) for name in names]
+    joined = parts[0]
+    for part in parts[1:]:
+        joined = joined + ', ' + part
+    return joined.str.strip(', ').tolist()
+
+def build_people_records(df):
+    """Build enriched_data documents from a chunk of the Apollo people CSV"""
+    full_name = _text_column(df, 'Full Name')
+    email = _text_column(df, 'Email')
+    linkedin = _text_column(df, 'LinkedIn URL')
+    company_phone = _text_column(df, 'Company Phone Number')
+    company_name = _text_column(df, 'Company Name')
+    columns = zip(
+        full_name, email, linkedin, company_phone, company_name,
+        _text_column(df, 'Job Title'), _text_column(df, 'First Name'), _text_column(df, 'Last Name'),
+        _text_column(df, 'Email Status'), _text_column(df, 'Twitter URL'), _text_column(df, 'Facebook URL'),
+        _text_column(df, 'City'), _text_column(df, 'State'), _text_column(df, 'Country'),
+        _text_column(df, 'Company Website'), _text_column(df, 'Industry'),
+        _location_column(df, 'City', 'State', 'Country'), _count_column(df, 'Employees'),
+        _text_column(df, 'Company Logo URL'), _text_column(df, 'Company City'), _text_column(df, 'Company State'),
+        _text_column(df, 'Company Country'), _text_column(df, 'Company LinkedIn URL'),
+        _text_column(df, 'Company Twitter URL'), _text_column(df, 'Company Facebook URL'), _text_column(df, 'Keywords'),
+    )
+    return [
+        {
             'data_source': 'apollo_csv',
             'enrichment_fields': {
-                'email': row.get('Email', ''),
-                'linkedin': row.get('LinkedIn URL', ''),
-                'contact_number': row.get('Company Phone Number', ''),
-                'company_name': row.get('Company Name', ''),
-                'prospect_full_name': row.get('Full Name', ''),
+                'email': email_,
+                'linkedin': linkedin_,
+                'contact_number': phone,
+                'company_name': company,
+                'prospect_full_name': name,
             },
             'all_prospects': [{
-                'name': row.get('Full Name', ''),
-                'title': row.get('Job Title', ''),
-                'first_name': row.get('First Name', ''),
-                'last_name': row.get('Last Name', ''),
-                'email': row.get('Email', ''),
-                'email_status': row.get('Email Status', ''),
-                'linkedin_id': row.get('LinkedIn URL', ''),
-                'twitter': row.get('Twitter URL', ''),
-                'facebook': row.get('Facebook URL', ''),
-                'city': row.get('City', ''),
-                'state': row.get('State', ''),
-                'country': row.get('Country', ''),
+                'name': name,
+                'title': title,
+                'first_name': first,
+                'last_name': last,
+                'email': email_,
+                'email_status': email_status,
+                'linkedin_id': linkedin_,
+                'twitter': twitter,
+                'facebook': facebook,
+                'city': city,
+                'state': state,
+                'country': country,
             }],
-            'company_name': row.get('Company Name', ''),
-            'website': row.get('Company Website', ''),
-            'industry': row.get('Industry', ''),
-            'location': f"{row.get('City', '')}, {row.get('State', '')}, {row.get('Country', '')}".strip(', '),
-            'employee_count': str(row.get('Employees', '')),
+            'company_name': company,
+            'website': website,
+            'industry': industry,
+            'location': location,
+            'employee_count': employees,
             'description': '',
             'company_details': {
-                'logo_url': row.get('Company Logo URL', ''),
-                'city': row.get('Company City', ''),
-                'state': row.get('Company State', ''),
-                'country': row.get('Company Country', ''),
-                'linkedin_url': row.get('Company LinkedIn URL', ''),
-                'twitter_url': row.get('Company Twitter URL', ''),
-                'facebook_url': row.get('Company Facebook URL', ''),
-                'phone_number': row.get('Company Phone Number', ''),
-                'keywords': row.get('Keywords', ''),
+                'logo_url': logo,
+                'city': company_city,
+                'state': company_state,
+                'country': company_country,
+                'linkedin_url': company_linkedin,
+                'twitter_url': company_twitter,
+                'facebook_url': company_facebook,
+                'phone_number': phone,
+                'keywords': keywords,
             }
         }
-        records.append(record)
-    
-    # Clear existing Apollo CSV data
-    await db.enriched_data.delete_many({'data_source': 'apollo_csv'})
-    
-    # Insert new data
-    if records:
-        result = await db.enriched_data.insert_many(records)
-        print(f"✅ Inserted {len(result.inserted_ids)} people records from Apollo CSV")
-    
-    return len(records)
+        for (name, email_, linkedin_, phone, company, title, first, last, email_status, twitter, facebook,
+             city, state, country, website, industry, location, employees, logo, company_city, company_state,
+             company_country, company_linkedin, company_twitter, company_facebook, keywords) in columns
+    ]
 
-async def load_apollo_companies_data():
-    """Load Apollo companies data from the second CSV"""
-    print("Loading Apollo companies data...")
-    
-    # Read the CSV
-    df = pd.read_csv('apollo_companies_data.csv')
-    
-    # Convert to records
-    records = []
-    for _, row in df.iterrows():
-        # Parse the data (seems to have some formatting issues)
-        name = row.get('Name', '')
-        title = row.get('Title', '')
-        company = row.get('Company Name', '')
-        industry = row.get('Industry', '')
-        location = row.get('Company Location', '')
-        employees = row.get('Employees', '')
-        
-        record = {
+def build_company_records(df):
+    """Build enriched_data documents from a chunk of the Apollo companies CSV"""
+    columns = zip(
+        _text_column(df, 'Name'), _text_column(df, 'Title'), _text_column(df, 'Company Name'),
+        _text_column(df, 'Industry'), _text_column(df, 'Company Location'), _count_column(df, 'Employees'),
+    )
+    return [
+        {
             'data_source': 'apollo_csv_companies',
             'enrichment_fields': {
                 'email': '',
@@ -112,25 +133,46 @@ async def load_apollo_companies_data():
             'website': '',
             'industry': industry,
             'location': location,
-            'employee_count': str(employees),
+            'employee_count': employees,
             'description': '',
         }
-        records.append(record)
-    
-    # Clear existing Apollo companies CSV data
-    await db.enriched_data.delete_many({'data_source': 'apollo_csv_companies'})
+        for name, title, company, industry, location, employees in columns
+    ]
+
+async def _load_csv(csv_path, data_source, build_records, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+    """Replace one Apollo data source in enriched_data with the rows of a CSV, chunk by chunk"""
+    # Clear existing data for this source
+    await db.enriched_data.delete_many({'data_source': data_source})
     
-    # Insert new data
-    if records:
-        result = await db.enriched_data.insert_many(records)
-        print(f"✅ Inserted {len(result.inserted_ids)} company records from Apollo CSV")
+    total = 0
+    # utf-8-sig strips the byte order mark Apollo exports start with
+    for chunk in pd.read_csv(csv_path, chunksize=chunk_size, encoding='utf-8-sig'):
+        records = [add_employee_range(record, 'enriched_data') for record in build_records(chunk)]
+        for start in range(0, len(records), batch_size):
+            result = await db.enriched_data.insert_many(records[start:start + batch_size], ordered=False)
+            total += len(result.inserted_ids)
+        print(f"   ... {total} records inserted from {Path(csv_path).name}")
     
-    return len(records)
+    return total
+
+async def load_apollo_people_data(csv_path=ROOT_DIR / 'apollo_people_data.csv', chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+    """Load Apollo people data from CSV"""
+    print("Loading Apollo people data...")
+    total = await _load_csv(csv_path, 'apollo_csv', build_people_records, chunk_size, batch_size)
+    print(f"✅ Inserted {total} people records from Apollo CSV")
+    return total
+
+async def load_apollo_companies_data(csv_path=ROOT_DIR / 'apollo_companies_data.csv', chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE):
+    """Load Apollo companies data from the second CSV"""
+    print("Loading Apollo companies data...")
+    total = await _load_csv(csv_path, 'apollo_csv_companies', build_company_records, chunk_size, batch_size)
+    print(f"✅ Inserted {total} company records from Apollo CSV")
+    return total
 
-async def main():
+async def main(args):
     try:
-        people_count = await load_apollo_people_data()
-        companies_count = await load_apollo_companies_data()
+        people_count = await load_apollo_people_data(args.people, args.chunk_size, args.batch_size)
+        companies_count = await load_apollo_companies_data(args.companies, args.chunk_size, args.batch_size)
         
         print(f"\n✅ Apollo CSV Data Loading Complete!")
         print(f"   - People records: {people_count}")
@@ -143,4 +185,11 @@ async def main():
         traceback.print_exc()
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description='Load Apollo CSV exports into the enriched_data collection')
+    parser.add_argument('--people', type=Path, default=ROOT_DIR / 'apollo_people_data.csv',
+                        help='Apollo people export CSV')
+    parser.add_argument('--companies', type=Path, default=ROOT_DIR / 'apollo_companies_data.csv',
+                        help='Apollo companies export CSV')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='CSV rows read per chunk')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help='Documents per insert_many batch')
+    asyncio.run(main(parser.parse_args()))
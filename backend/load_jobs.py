@@ -0,0 +1,131 @@
+"""
+Load Job Manager - Owns the background data load and tracks its state for the API
+"""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Iterable
+
+logger = logging.getLogger(__name__)
+
+# Retry-After sent while a cold load is running and no ETA is known yet
+DEFAULT_RETRY_AFTER_SECONDS = 30
+
+class LoadJobManager:
+    """
+    Runs at most one DataLoader.load_all_data at a time. Triggers that arrive while a
+    load is queued or running are coalesced into that load, except a forced trigger
+    during a non-forced load: that queues a forced load to run once the current one
+    finishes (and later triggers coalesce into it). The job moves through the states
+    queued -> running -> done | failed.
+    
+    after_load callbacks (e.g. refreshing the search index) are awaited after every
+    successful load; their failures are logged without failing the job.
+    """
+    def __init__(self, data_loader, after_load: Iterable[Callable[[], Awaitable]] = ()):
+        self.data_loader = data_loader
+        self.after_load = list(after_load)
+        self.job = None
+        self.task = None
+        # Whether the collections hold a complete load that search can serve from
+        self.ready = False
+    
+    async def check_ready(self):
+        """
+        Data is ready if the collections are populated and no load was interrupted
+        part-way (an interrupted load leaves a checkpoint in the 'running' state)
+        """
+        db = self.data_loader.db
+        populated = (
+            await db.crunchbase_companies.estimated_document_count() > 0
+            or await db.linkedin_companies.estimated_document_count() > 0
+        )
+        interrupted = await db.load_checkpoints.count_documents({'status': 'running'}, limit=1) > 0
+        self.ready = populated and not interrupted
+        return self.ready
+    
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+    
+    def is_cold_loading(self) -> bool:
+        """True while a load is running and there is no complete data set to serve"""
+        return self.is_running() and not self.ready
+    
+    def start(self, force: bool = False) -> Dict:
+        """Start a load, or join the one already queued/running"""
+        previous = None
+        if self.is_running():
+            if not force or self.job['force']:
+                self.job['coalesced_triggers'] += 1
+                logger.info(f"Load job {self.job['id']} already {self.job['state']} - coalescing trigger")
+                return self.job
+            # Joining would drop the force; reload everything after the current load instead
+            previous = self.job
+            logger.info(f"Load job {previous['id']} is not forced - queueing a forced load after it")
+        
+        self.job = {
+            'id': str(uuid.uuid4()),
+            'state': 'queued',
+            'force': force,
+            'queued_at': datetime.now(timezone.utc).isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'duration_seconds': None,
+            'coalesced_triggers': 0,
+            # Load this job waits for before it starts
+            'after_job': previous['id'] if previous else None,
+            'error': None,
+            'report': None,
+        }
+        if previous is None:
+            self.task = asyncio.create_task(self._run(self.job))
+        else:
+            self.task = asyncio.create_task(self._run_after(self.task, self.job))
+        return self.job
+    
+    async def wait(self) -> Dict:
+        """Wait for the current job to finish (without cancelling it if the caller goes away)"""
+        if self.task is not None:
+            await asyncio.shield(asyncio.wait({self.task}))
+        return self.job
+    
+    async def _run_after(self, previous: asyncio.Task, job: Dict):
+        await asyncio.wait({previous})
+        await self._run(job)
+    
+    async def _run(self, job: Dict):
+        job['state'] = 'running'
+        job['started_at'] = datetime.now(timezone.utc).isoformat()
+        started = time.monotonic()
+        try:
+            job['report'] = await self.data_loader.load_all_data(force=job['force'])
+            job['state'] = 'done'
+            self.ready = True
+        except Exception as e:
+            job['state'] = 'failed'
+            job['error'] = str(e)
+            logger.error(f"Load job {job['id']} failed: {str(e)}")
+        finally:
+            job['finished_at'] = datetime.now(timezone.utc).isoformat()
+            job['duration_seconds'] = round(time.monotonic() - started, 3)
+        
+        if job['state'] == 'done':
+            for callback in self.after_load:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.error(f"Post-load step {getattr(callback, '__qualname__', callback)} failed: {str(e)}")
+    
+    def retry_after(self) -> int:
+        """Seconds a client should wait before retrying during a cold load"""
+        etas = [
+            entry['eta_seconds'] for entry in self.data_loader.progress.snapshot().values()
+            if entry['eta_seconds'] is not None
+        ]
+        return max(1, int(max(etas))) if etas else DEFAULT_RETRY_AFTER_SECONDS
+    
+    def status(self) -> Dict:
+        """Current (or last) job state plus data readiness"""
+        return {'ready': self.ready, 'job': self.job}
@@ -0,0 +1,74 @@
+"""
+Load Progress - Tracks live per-source progress of a data load for the progress API
+"""
+import time
+from typing import Dict, Optional
+
+class LoadProgress:
+    """
+    Per-source load progress: current phase, rows written, throughput and an ETA.
+    The ETA is derived from bytes read when the source size is known.
+    """
+    def __init__(self):
+        self.sources = {}
+    
+    def start(self, source: str, phase: str, total_bytes: Optional[int] = None, resumed_rows: int = 0):
+        """Begin tracking a source, discarding progress from any previous run"""
+        self.sources[source] = {
+            'phase': phase,
+            'rows': resumed_rows,
+            'resumed_rows': resumed_rows,
+            'bytes_read': 0,
+            'total_bytes': total_bytes,
+            'started': time.monotonic(),
+            'finished': None,
+            'error': None,
+        }
+    
+    def update(self, source: str, phase: Optional[str] = None, rows: Optional[int] = None,
+               bytes_read: Optional[int] = None):
+        """Record progress for a source that is being loaded"""
+        entry = self.sources.get(source)
+        if entry is None:
+            return
+        if phase is not None:
+            entry['phase'] = phase
+        if rows is not None:
+            entry['rows'] = entry['resumed_rows'] + rows
+        if bytes_read is not None:
+            entry['bytes_read'] = bytes_read
+    
+    def finish(self, source: str, error: Optional[str] = None):
+        """Mark a source as done, or failed if an error is given"""
+        entry = self.sources.get(source)
+        if entry is None:
+            return
+        entry['phase'] = 'failed' if error else 'done'
+        entry['error'] = error
+        entry['finished'] = time.monotonic()
+    
+    def snapshot(self) -> Dict:
+        """JSON-ready view of every tracked source"""
+        now = time.monotonic()
+        snapshot = {}
+        for source, entry in self.sources.items():
+            elapsed = (entry['finished'] or now) - entry['started']
+            new_rows = entry['rows'] - entry['resumed_rows']
+            
+            eta = None
+            if entry['finished'] is None and entry['total_bytes'] and entry['bytes_read']:
+                remaining = max(entry['total_bytes'] - entry['bytes_read'], 0)
+                eta = round(elapsed * remaining / entry['bytes_read'], 1)
+            
+            snapshot[source] = {
+                'phase': entry['phase'],
+                'rows': entry['rows'],
+                'resumed_from_row': entry['resumed_rows'] or None,
+                'rows_per_sec': round(new_rows / elapsed, 1) if elapsed > 0 else None,
+                'bytes_read': entry['bytes_read'] or None,
+                'total_bytes': entry['total_bytes'],
+                'elapsed_seconds': round(elapsed, 1),
+                'eta_seconds': eta,
+                'error': entry['error'],
+            }
+        return snapshot
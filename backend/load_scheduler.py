@@ -0,0 +1,113 @@
+"""
+Load Scheduler - Runs data load tasks concurrently while respecting their dependencies
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+class LoadScheduler:
+    """
+    Runs named async tasks as soon as all of their dependencies have finished, so
+    independent sources load concurrently. A task whose dependency failed is skipped.
+    """
+    def __init__(self):
+        self.tasks = {}
+        self.timings = {}
+    
+    def add_task(self, name: str, run: Callable[[], Awaitable], depends_on: Iterable[str] = ()):
+        """Register a task; dependencies must be registered before run() is called"""
+        if name in self.tasks:
+            raise ValueError(f"Duplicate load task: {name}")
+        self.tasks[name] = {'run': run, 'depends_on': list(depends_on)}
+    
+    def _check_graph(self):
+        """Reject unknown dependencies and dependency cycles"""
+        for name, task in self.tasks.items():
+            for dependency in task['depends_on']:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Load task {name} depends on unknown task {dependency}")
+        
+        visiting, done = set(), set()
+        
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle detected at load task {name}")
+            visiting.add(name)
+            for dependency in self.tasks[name]['depends_on']:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+        
+        for name in self.tasks:
+            visit(name)
+    
+    async def run(self) -> Dict:
+        """Run every task and return per-task timings plus the critical path"""
+        self._check_graph()
+        started_at = time.monotonic()
+        running = {}
+        
+        async def run_task(name):
+            task = self.tasks[name]
+            for dependency in task['depends_on']:
+                try:
+                    await running[dependency]
+                except Exception:
+                    self.timings[name] = {'status': 'skipped', 'start': None, 'end': None}
+                    raise RuntimeError(f"Load task {name} skipped: dependency {dependency} failed")
+            
+            start = time.monotonic() - started_at
+            self.timings[name] = {'status': 'running', 'start': start, 'end': None}
+            logger.info(f"Load task {name} started")
+            try:
+                await task['run']()
+            except Exception as e:
+                self.timings[name].update(status='failed', end=time.monotonic() - started_at)
+                logger.error(f"Load task {name} failed: {str(e)}")
+                raise
+            self.timings[name].update(status='done', end=time.monotonic() - started_at)
+            logger.info(f"Load task {name} finished in {self.timings[name]['end'] - start:.2f}s")
+        
+        for name in self.tasks:
+            running[name] = asyncio.ensure_future(run_task(name))
+        results = await asyncio.gather(*running.values(), return_exceptions=True)
+        
+        report = {
+            'total_seconds': round(time.monotonic() - started_at, 3),
+            'tasks': {
+                name: {
+                    'status': timing['status'],
+                    'seconds': round(timing['end'] - timing['start'], 3) if timing['end'] is not None else None,
+                }
+                for name, timing in self.timings.items()
+            },
+            'critical_path': self.critical_path(),
+        }
+        logger.info(f"Load finished in {report['total_seconds']}s, critical path: {' -> '.join(report['critical_path'])}")
+        
+        errors = [result for result in results if isinstance(result, Exception)]
+        if errors:
+            raise errors[0]
+        return report
+    
+    def critical_path(self) -> List[str]:
+        """
+        The chain of tasks that bounded total load time: starting from the task that
+        finished last, repeatedly follow the dependency that finished last.
+        """
+        finished = {name: timing['end'] for name, timing in self.timings.items() if timing['end'] is not None}
+        if not finished:
+            return []
+        
+        path = [max(finished, key=finished.get)]
+        while True:
+            dependencies = [d for d in self.tasks[path[-1]]['depends_on'] if d in finished]
+            if not dependencies:
+                break
+            path.append(max(dependencies, key=finished.get))
+        return list(reversed(path))
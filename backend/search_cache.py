@@ -0,0 +1,124 @@
+"""
+Search Cache - LRU + TTL cache of search results, invalidated when the data generation changes
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('SEARCH_CACHE_MAX_ENTRIES', 1024))
+SEARCH_CACHE_TTL_SECONDS = float(os.environ.get('SEARCH_CACHE_TTL_SECONDS', 300))
+SEARCH_CACHE_MAX_BYTES = int(os.environ.get('SEARCH_CACHE_MAX_BYTES', 64 << 20))
+
+def normalize_search_value(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a search string for use in a cache key. Searches are case-insensitive,
+    so case is folded, except in strings with regex escapes where case is meaningful.
+    Empty strings search like None.
+    """
+    if not value:
+        return None
+    return value if '\\' in value else value.lower()
+
+class SearchCache:
+    """
+    Caches computed search results by key with LRU eviction, a TTL and a bound on the
+    (serialized) size of the cached values. Entries belong to a data generation; the
+    whole cache is dropped as soon as a lookup arrives with a newer generation.
+    Concurrent lookups of the same missing key share a single computation.
+    """
+    def __init__(self, max_entries: int = SEARCH_CACHE_MAX_ENTRIES, ttl_seconds: float = SEARCH_CACHE_TTL_SECONDS,
+                 max_bytes: int = SEARCH_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        # key -> (expires_at, size_bytes, value), least recently used first
+        self.entries = OrderedDict()
+        self.inflight = {}
+        self.generation = None
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+    
+    async def get_or_compute(self, key: Hashable, generation: int, compute: Callable[[], Awaitable[Any]],
+                             cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Return the cached value for key, computing (once) and caching it on a miss"""
+        if generation != self.generation:
+            if self.entries:
+                logger.info(f"Data generation changed to {generation} - dropping {len(self.entries)} cached searches")
+            self.clear()
+            # Computations still running for the old generation are no longer joined
+            self.inflight.clear()
+            self.generation = generation
+        
+        entry = self.entries.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self._remove(key)
+        
+        task = self.inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(compute())
+            self.inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, generation, done, cacheable))
+        # Shielded so one caller going away does not cancel the computation for the others
+        return await asyncio.shield(task)
+    
+    def _finish(self, key: Hashable, generation: int, task: asyncio.Future, cacheable: Callable[[Any], bool]):
+        """Store a finished computation, unless it failed or the generation moved on meanwhile"""
+        if self.inflight.get(key) is task:
+            del self.inflight[key]
+        if task.cancelled() or task.exception() is not None or generation != self.generation:
+            return
+        value = task.result()
+        if not cacheable(value):
+            return
+        
+        size = len(orjson.dumps(value, default=str, option=orjson.OPT_NON_STR_KEYS))
+        if size > self.max_bytes:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, size, value)
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+    
+    def _remove(self, key: Hashable):
+        _, size, _ = self.entries.pop(key)
+        self.bytes -= size
+    
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+    
+    def stats(self) -> Dict:
+        """Hit/miss counters and current size"""
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            'generation': self.generation,
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'max_entries': self.max_entries,
+            'max_bytes': self.max_bytes,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            'inflight': len(self.inflight),
+        }
@@ -0,0 +1,300 @@
+"""
+Search Index - In-process trigram index that resolves company search queries to document ids
+"""
+import asyncio
+import bisect
+import logging
+import os
+import re
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from enrichment_service import SEARCH_QUERY_FIELDS, SEARCH_SUBSTRING_FIELDS, build_search_filters
+
+logger = logging.getLogger(__name__)
+
+# Shortest query the index can answer (one full trigram); shorter queries use the regex path
+MIN_QUERY_LENGTH = 3
+
+# A query whose rarest trigram appears in more documents than this is too unselective to be
+# worth intersecting in memory; the regex path finds the first `limit` matches quickly instead
+MAX_CANDIDATES = int(os.environ.get('SEARCH_INDEX_MAX_CANDIDATES', 20000))
+
+# Documents handed to the indexing thread at once during a build or refresh
+INDEX_BATCH_SIZE = 5000
+
+# Seconds a collection snapshot is trusted before search reads it again. Loads run by this
+# process mark the index stale at once; this only bounds how long writes by another
+# process (load_apollo_csv) go unnoticed.
+SNAPSHOT_CHECK_INTERVAL = float(os.environ.get('SEARCH_INDEX_SNAPSHOT_INTERVAL', 5))
+
+# Field used to find documents written since the last refresh. The Apollo importer inserts
+# fresh documents on every run, so a growing _id is enough there.
+WATERMARK_FIELDS = {
+    'enriched_data': '_id',
+    'crunchbase_companies': '_loaded_at',
+    'linkedin_companies': '_loaded_at',
+}
+
+# Search queries are regexes; only plain text can be answered from trigrams
+REGEX_METACHARACTERS = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+EMPTY_POSTINGS = array('I')
+
+def trigrams(text: str) -> Set[str]:
+    """Distinct 3-character substrings of already-normalized text"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _field_values(document: Dict, path: str) -> Iterable[str]:
+    """String values at a dotted path, descending into lists like MongoDB does"""
+    values = [document]
+    for part in path.split('.'):
+        next_values = []
+        for value in values:
+            if isinstance(value, list):
+                value = [item.get(part) for item in value if isinstance(item, dict)]
+                next_values.extend(value)
+            elif isinstance(value, dict):
+                next_values.append(value.get(part))
+        values = next_values
+    
+    for value in values:
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, list):
+            yield from (item for item in value if isinstance(item, str))
+
+def _contains(postings: array, ordinal: int) -> bool:
+    """Membership test on a sorted posting list"""
+    position = bisect.bisect_left(postings, ordinal)
+    return position < len(postings) and postings[position] == ordinal
+
+class CompanySearchIndex:
+    """
+    Trigram inverted index over the fields each collection's search query matches by
+    substring (enrichment_service.SEARCH_SUBSTRING_FIELDS). Every document whose field
+    contains the query as a substring holds all of the query's trigrams, so intersecting
+    posting lists yields a superset of the regex matches; search then fetches only those
+    _ids and MongoDB re-checks the regex on them. Free-text fields are left to the
+    collection's text index, which search queries alongside.
+    
+    Documents get increasing ordinals, so posting lists stay sorted by appending. A
+    document that is re-indexed gets a new ordinal and its old one is marked dead.
+    
+    The index is current for the data generation it was refreshed at. A load run by
+    data_loader makes the whole index stale until the post-load refresh, and no refresh
+    starts while a load is writing: loaded_at watermarks are shared by every record of a
+    file and batches land out of order, so a refresh mid-load could move a watermark
+    past records that are not written yet.
+    """
+    def __init__(self, db: AsyncIOMotorDatabase, data_loader=None, max_candidates: int = MAX_CANDIDATES):
+        self.db = db
+        self.data_loader = data_loader
+        self.max_candidates = max_candidates
+        self.collections = list(SEARCH_QUERY_FIELDS)
+        self.postings = {}
+        # Ordinal -> (collection number, _id), and the live ordinal of each document
+        self.doc_collections = array('B')
+        self.doc_ids = []
+        self.ordinals = {}
+        self.dead = set()
+        self.watermarks = {}
+        # (document count, largest _id) of each collection when it was last indexed
+        self.snapshots = {}
+        # Data generation of the last refresh
+        self.generation = None
+        # Latest snapshots read by search, when they were read, and the read in flight
+        self.checked_snapshots = {}
+        self.checked_at = None
+        self.check_task = None
+        self.ready = False
+        self.lock = asyncio.Lock()
+        self.refresh_task = None
+    
+    def _loading(self) -> bool:
+        return bool(self.data_loader and self.data_loader.loading)
+    
+    def _current_generation(self):
+        return self.data_loader.generation if self.data_loader else None
+    
+    def _add_documents(self, collection_number: int, documents: List[Dict], watermark=None):
+        """
+        Index a batch of documents (runs in a worker thread). Documents whose watermark
+        field equals the previous watermark were read again by the inclusive refresh
+        query; those already indexed are skipped.
+        """
+        collection_name = self.collections[collection_number]
+        fields = SEARCH_SUBSTRING_FIELDS[collection_name]
+        watermark_field = WATERMARK_FIELDS[collection_name]
+        for document in documents:
+            key = (collection_number, document['_id'])
+            previous = self.ordinals.get(key)
+            if previous is not None:
+                if watermark is not None and document.get(watermark_field) == watermark:
+                    continue
+                self.dead.add(previous)
+            
+            grams = set()
+            for field in fields:
+                for value in _field_values(document, field):
+                    grams |= trigrams(value.lower())
+            
+            ordinal = len(self.doc_ids)
+            # Ids first, so a concurrent lookup never finds an ordinal it cannot resolve
+            self.doc_collections.append(collection_number)
+            self.doc_ids.append(document['_id'])
+            for gram in grams:
+                postings = self.postings.get(gram)
+                if postings is None:
+                    postings = self.postings[gram] = array('I')
+                postings.append(ordinal)
+            self.ordinals[key] = ordinal
+    
+    async def _snapshot(self, collection_name: str) -> Tuple[int, object]:
+        """
+        Cheap fingerprint of a collection's contents: its (metadata) document count and
+        largest _id. Inserts and delete-and-reinsert imports (load_apollo_csv) change it.
+        """
+        count, latest = await asyncio.gather(
+            self.db[collection_name].estimated_document_count(),
+            self.db[collection_name].find_one({}, {'_id': 1}, sort=[('_id', -1)]),
+        )
+        return count, latest['_id'] if latest else None
+    
+    async def refresh(self):
+        """
+        Index every document written since the last refresh. The first refresh builds
+        the index from scratch; lookups are answered once it has finished.
+        
+        The watermark comparison is inclusive, since several documents can share a
+        watermark value; documents at the old watermark that are already indexed are
+        skipped.
+        """
+        async with self.lock:
+            started = time.monotonic()
+            indexed = 0
+            base_filters = build_search_filters()
+            # Taken before reading, so a load finishing meanwhile makes the index stale
+            generation = self._current_generation()
+            
+            for collection_number, collection_name in enumerate(self.collections):
+                # Taken before reading, so documents written meanwhile make the snapshot stale
+                snapshot = await self._snapshot(collection_name)
+                watermark_field = WATERMARK_FIELDS[collection_name]
+                query_filter = dict(base_filters[collection_name])
+                previous_watermark = watermark = self.watermarks.get(collection_name)
+                if watermark is not None:
+                    query_filter[watermark_field] = {'$gte': watermark}
+                
+                projection = {field: 1 for field in SEARCH_SUBSTRING_FIELDS[collection_name]}
+                projection[watermark_field] = 1
+                cursor = self.db[collection_name].find(query_filter, projection).batch_size(INDEX_BATCH_SIZE)
+                
+                batch = []
+                async for document in cursor:
+                    value = document.get(watermark_field)
+                    if value is not None and (watermark is None or value > watermark):
+                        watermark = value
+                    batch.append(document)
+                    if len(batch) >= INDEX_BATCH_SIZE:
+                        await asyncio.to_thread(self._add_documents, collection_number, batch, previous_watermark)
+                        indexed += len(batch)
+                        batch = []
+                if batch:
+                    await asyncio.to_thread(self._add_documents, collection_number, batch, previous_watermark)
+                    indexed += len(batch)
+                
+                if watermark is not None:
+                    self.watermarks[collection_name] = watermark
+                self.snapshots[collection_name] = snapshot
+                self.checked_snapshots[collection_name] = snapshot
+            
+            self.generation = generation
+            self.checked_at = started
+            self.ready = True
+            logger.info(
+                f"Search index refreshed: {indexed} documents indexed in "
+                f"{time.monotonic() - started:.2f}s ({len(self.ordinals)} total, {len(self.postings)} trigrams)"
+            )
+    
+    async def _check_snapshots(self):
+        """Read every collection's snapshot again"""
+        snapshots = await asyncio.gather(*(self._snapshot(name) for name in self.collections))
+        self.checked_snapshots = dict(zip(self.collections, snapshots))
+        self.checked_at = time.monotonic()
+    
+    async def current_collections(self) -> Set[str]:
+        """
+        The collections whose contents are unchanged since they were indexed. Nothing is
+        current while a load runs or after one finished (the data generation moved on).
+        Otherwise collections are compared by snapshot, read at most once every
+        SNAPSHOT_CHECK_INTERVAL seconds and shared by concurrent searches, so writes by
+        another process (load_apollo_csv) are noticed. When something is stale and no
+        load is running, a background refresh is started to catch up.
+        """
+        if self._loading():
+            return set()
+        
+        if self._current_generation() != self.generation:
+            current = set()
+        else:
+            if self.checked_at is None or time.monotonic() - self.checked_at >= SNAPSHOT_CHECK_INTERVAL:
+                if self.check_task is None or self.check_task.done():
+                    self.check_task = asyncio.create_task(self._check_snapshots())
+                await asyncio.shield(self.check_task)
+            current = {
+                name for name in self.collections
+                if name in self.snapshots and self.snapshots[name] == self.checked_snapshots.get(name)
+            }
+        
+        if len(current) < len(self.collections) and not self.lock.locked() \
+                and (self.refresh_task is None or self.refresh_task.done()):
+            self.refresh_task = asyncio.create_task(self.refresh())
+        return current
+    
+    async def lookup(self, query: str) -> Optional[Dict[str, List]]:
+        """
+        Candidate _ids per collection for a search query, or None when the index
+        cannot answer it (not built yet, regex syntax, too short or too unselective).
+        Collections that changed since they were indexed are left out, so their
+        queries are matched by regex alone.
+        """
+        if not self.ready or not query or REGEX_METACHARACTERS.search(query):
+            return None
+        text = query.lower()
+        if len(text) < MIN_QUERY_LENGTH:
+            return None
+        
+        posting_lists = sorted((self.postings.get(gram, EMPTY_POSTINGS) for gram in trigrams(text)), key=len)
+        if len(posting_lists[0]) > self.max_candidates:
+            return None
+        
+        candidates = [ordinal for ordinal in posting_lists[0] if ordinal not in self.dead]
+        for postings in posting_lists[1:]:
+            if not candidates:
+                break
+            candidates = [ordinal for ordinal in candidates if _contains(postings, ordinal)]
+        
+        ids = {collection_name: [] for collection_name in self.collections}
+        for ordinal in candidates:
+            ids[self.collections[self.doc_collections[ordinal]]].append(self.doc_ids[ordinal])
+        
+        current = await self.current_collections()
+        if not current:
+            return None
+        return {collection_name: ids[collection_name] for collection_name in self.collections if collection_name in current}
+    
+    def stats(self) -> Dict:
+        """Size of the index"""
+        return {
+            'ready': self.ready,
+            'generation': self.generation,
+            'documents': len(self.ordinals),
+            'dead_ordinals': len(self.dead),
+            'trigrams': len(self.postings),
+            'watermarks': {name: str(value) for name, value in self.watermarks.items()},
+            'snapshots': {name: [count, str(latest)] for name, (count, latest) in self.snapshots.items()},
+        }
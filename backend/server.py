@@ -1,4 +1,5 @@
 from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
@@ -10,15 +11,24 @@ from typing import List, Optional, Literal
 import uuid
 from datetime import datetime, timezone, timedelta
 import requests
-import asyncio
 from playwright.async_api import async_playwright
 import pandas as pd
 from io import StringIO, BytesIO
 import json
+import orjson
 
 # Import our new services
 from data_loader import DataLoader
-from enrichment_service import EnrichmentService
+from enriched_view import EnrichedCompanyView
+from entity_resolution import EntityResolver
+from enrichment_service import (
+    JOB_SEARCH_MAX_LIMIT, EnrichmentService, decode_job_search_cursor, decode_search_cursor, resolve_search_fields
+)
+from facets import FacetService
+from hiring import HiringSummaries
+from load_jobs import LoadJobManager
+from search_cache import SearchCache, normalize_search_value
+from search_index import CompanySearchIndex
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -30,7 +40,29 @@ db = client[os.environ.get('DB_NAME', 'leadintel_db')]
 
 # Initialize services
 data_loader = DataLoader(db)
-enrichment_service = EnrichmentService(db)
+search_index = CompanySearchIndex(db, data_loader)
+entity_resolver = EntityResolver(db, data_loader)
+enriched_view = EnrichedCompanyView(db, data_loader)
+facet_service = FacetService(db, data_loader)
+hiring_summaries = HiringSummaries(db, data_loader)
+load_jobs = LoadJobManager(
+    data_loader,
+    # The search index and the view are built after resolution, whose run moves the data
+    # generation on
+    after_load=[entity_resolver.run, search_index.refresh, enriched_view.run, facet_service.precompute,
+                hiring_summaries.run]
+)
+enrichment_service = EnrichmentService(db, search_index, enriched_view, hiring_summaries)
+search_cache = SearchCache()
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    JSON response serialized straight to bytes by orjson. Handlers return it directly,
+    which skips FastAPI's jsonable_encoder pass over the content. NaN/Infinity
+    serialize as null and values orjson does not know (ObjectId) as strings.
+    """
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
 
 # Create the main app without a prefix
 app = FastAPI()
@@ -91,6 +123,42 @@ class EnrichmentSearchRequest(BaseModel):
     min_employees: Optional[int] = None
     max_employees: Optional[int] = None
     limit: int = 50
+    # "text" ranks results by relevance using the collections' text indexes
+    mode: Literal["regex", "text"] = "regex"
+    # Output fields to return (see enrichment_service.SEARCH_FIELDS); all fields if unset
+    fields: Optional[List[str]] = None
+    # Keyset pagination: paginate=true starts at page one, cursor (next_cursor of the
+    # previous response) continues from there
+    paginate: bool = False
+    cursor: Optional[str] = None
+    # Stream results as NDJSON (one record per line) as they are read
+    stream: bool = False
+    # Search the merged golden company records instead of each source separately
+    resolved: bool = False
+
+class EnrichmentFacetsRequest(BaseModel):
+    query: Optional[str] = None
+    industry: Optional[str] = None
+    location: Optional[str] = None
+    min_employees: Optional[int] = None
+    max_employees: Optional[int] = None
+
+class JobSearchRequest(BaseModel):
+    # Keywords matched against titles and descriptions (text index)
+    query: Optional[str] = None
+    location: Optional[str] = None
+    # e.g. FULL_TIME, CONTRACT ("full-time" works too)
+    work_type: Optional[str] = None
+    # Annualized salary range
+    min_salary: Optional[float] = Field(None, ge=0)
+    max_salary: Optional[float] = Field(None, ge=0)
+    posted_within_days: Optional[int] = Field(None, ge=0)
+    limit: int = Field(50, ge=1, le=JOB_SEARCH_MAX_LIMIT)
+    # next_cursor of the previous page
+    cursor: Optional[str] = None
+    # Stream postings as NDJSON (one posting per line) as they are read
+    stream: bool = False
+    include_description: bool = False
 
 class CompanyJobsRequest(BaseModel):
     company_id: Optional[str] = None
@@ -446,14 +514,40 @@ async def data_status():
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/data/load")
-async def load_data():
-    """Trigger data loading from files into MongoDB"""
-    try:
-        await data_loader.load_all_data()
-        return {"message": "Data loaded successfully"}
-    except Exception as e:
-        logger.error(f"Error loading data: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+async def load_data(force: bool = False, wait: bool = True):
+    """
+    Trigger data loading from files into MongoDB (only changed files unless force is set).
+    A trigger while a load is already running joins that load instead of starting another;
+    a forced trigger during a non-forced load queues a forced load to run after it.
+    With wait=false the job state is returned immediately.
+    """
+    job = load_jobs.start(force=force)
+    if not wait:
+        return {"message": f"Data load {job['state']}", "job": job}
+    
+    job = await load_jobs.wait()
+    if job['state'] == 'failed':
+        raise HTTPException(status_code=500, detail=job['error'])
+    return {"message": "Data loaded successfully", "report": job['report'], "job": job}
+
+@api_router.get("/data/load/status")
+async def load_status():
+    """Get the state (queued, running, failed, done) and timings of the current or last data load"""
+    return {**load_jobs.status(), "search_index": search_index.stats(), "enriched_view": enriched_view.stats()}
+
+@api_router.get("/data/load/progress")
+async def load_progress():
+    """Get live per-source progress of the current or last data load"""
+    return {"sources": data_loader.progress.snapshot()}
+
+def require_loaded_data():
+    """Fail fast with 503 instead of serving slow, partial results while the first load runs"""
+    if load_jobs.is_cold_loading():
+        raise HTTPException(
+            status_code=503,
+            detail="Data is still loading",
+            headers={"Retry-After": str(load_jobs.retry_after())}
+        )
 
 @api_router.post("/enrichment/search")
 async def enrichment_search(request: EnrichmentSearchRequest):
@@ -467,27 +561,129 @@ async def enrichment_search(request: EnrichmentSearchRequest):
     - Prospect names
     - And more...
     """
+    require_loaded_data()
+    
+    try:
+        if request.fields is not None:
+            resolve_search_fields(request.fields)
+        cursor = decode_search_cursor(request.cursor) if request.cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if (request.paginate or cursor is not None) and request.mode == "text" and request.query:
+        raise HTTPException(status_code=400, detail="Pagination is not supported for text mode searches")
+    
+    if request.stream:
+        if request.paginate or cursor is not None or (request.mode == "text" and request.query):
+            raise HTTPException(status_code=400, detail="Streaming does not support pagination or text mode")
+        from fastapi.responses import StreamingResponse
+        
+        async def ndjson_lines():
+            async for result in enrichment_service.stream_companies(
+                query=request.query,
+                industry=request.industry,
+                location=request.location,
+                min_employees=request.min_employees,
+                max_employees=request.max_employees,
+                limit=request.limit,
+                fields=request.fields,
+                resolved=request.resolved
+            ):
+                yield orjson.dumps(result, default=str) + b"\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
     try:
-        results = await enrichment_service.search_companies(
+        # Searches are case-insensitive, so requests differing only in case share an entry
+        cache_key = (
+            normalize_search_value(request.query),
+            normalize_search_value(request.industry),
+            normalize_search_value(request.location),
+            request.min_employees,
+            request.max_employees,
+            request.limit,
+            request.mode,
+            tuple(sorted(set(request.fields))) if request.fields is not None else None,
+            request.paginate,
+            request.cursor,
+            request.resolved,
+        )
+        search = await search_cache.get_or_compute(
+            cache_key,
+            data_loader.generation,
+            lambda: enrichment_service.search_companies(
+                query=request.query,
+                industry=request.industry,
+                location=request.location,
+                min_employees=request.min_employees,
+                max_employees=request.max_employees,
+                limit=request.limit,
+                mode=request.mode,
+                fields=request.fields,
+                paginate=request.paginate,
+                cursor=cursor,
+                resolved=request.resolved
+            ),
+            # Partial results (timed out or failed sources) are served but not cached
+            cacheable=lambda search: not search['partial']
+        )
+        
+        results = search['results']
+        
+        return FastJSONResponse({
+            "results": results,
+            "count": len(results),
+            # Sources that missed their deadline; results are partial when this is non-empty
+            "timed_out_sources": search['timed_out_sources'],
+            # Sources whose query failed
+            "failed_sources": search['failed_sources'],
+            "partial": search['partial'],
+            # Pass back as cursor to fetch the next page (paginated searches only)
+            "next_cursor": search.get('next_cursor'),
+            "filters": {
+                "query": request.query,
+                "industry": request.industry,
+                "location": request.location,
+                "mode": request.mode,
+                "fields": request.fields
+            }
+        })
+    except Exception as e:
+        logger.error(f"Enrichment search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/enrichment/search/cache")
+async def enrichment_search_cache():
+    """Get hit/miss rates and size of the search result cache"""
+    return search_cache.stats()
+
+@api_router.post("/enrichment/facets")
+async def enrichment_facets(request: EnrichmentFacetsRequest):
+    """
+    Count the resolved companies matching the search filters per industry, country,
+    employee size bucket and data source
+    """
+    require_loaded_data()
+    
+    try:
+        facets = await facet_service.facets(
             query=request.query,
             industry=request.industry,
             location=request.location,
             min_employees=request.min_employees,
-            max_employees=request.max_employees,
-            limit=request.limit
+            max_employees=request.max_employees
         )
-        
         return {
-            "results": results,
-            "count": len(results),
+            **facets,
             "filters": {
                 "query": request.query,
                 "industry": request.industry,
-                "location": request.location
+                "location": request.location,
+                "min_employees": request.min_employees,
+                "max_employees": request.max_employees
             }
         }
     except Exception as e:
-        logger.error(f"Enrichment search error: {str(e)}")
+        logger.error(f"Enrichment facets error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/enrichment/jobs")
@@ -499,14 +695,89 @@ async def get_company_jobs(request: CompanyJobsRequest):
             company_name=request.company_name
         )
         
-        return {
+        return FastJSONResponse({
             "results": jobs,
             "count": len(jobs)
-        }
+        })
     except Exception as e:
         logger.error(f"Get company jobs error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/enrichment/jobs/summary")
+async def get_company_hiring_summary(request: CompanyJobsRequest):
+    """Get the pre-aggregated hiring summary (open roles, top titles, locations, latest posting) of a company"""
+    try:
+        summaries = await hiring_summaries.summaries(
+            company_id=request.company_id,
+            company_name=request.company_name
+        )
+        
+        return FastJSONResponse({
+            "results": summaries,
+            "count": len(summaries)
+        })
+    except Exception as e:
+        logger.error(f"Get company hiring summary error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/jobs/search")
+async def search_jobs(request: JobSearchRequest):
+    """
+    Search job postings across companies by keywords, location, work type, salary
+    range and posting date, a keyset-paginated page at a time or streamed as NDJSON
+    """
+    require_loaded_data()
+    
+    try:
+        cursor = decode_job_search_cursor(request.cursor) if request.cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if request.min_salary is not None and request.max_salary is not None and request.min_salary > request.max_salary:
+        raise HTTPException(status_code=400, detail="min_salary is greater than max_salary")
+    
+    filters = {
+        "query": request.query,
+        "location": request.location,
+        "work_type": request.work_type,
+        "min_salary": request.min_salary,
+        "max_salary": request.max_salary,
+        "posted_within_days": request.posted_within_days
+    }
+    
+    if request.stream:
+        if cursor is not None:
+            raise HTTPException(status_code=400, detail="Streaming does not support pagination")
+        from fastapi.responses import StreamingResponse
+        
+        async def ndjson_lines():
+            async for job in enrichment_service.stream_jobs(
+                **filters,
+                limit=request.limit,
+                include_description=request.include_description
+            ):
+                yield orjson.dumps(job, default=str) + b"\n"
+        
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+    
+    try:
+        search = await enrichment_service.search_jobs(
+            **filters,
+            limit=request.limit,
+            cursor=cursor,
+            include_description=request.include_description
+        )
+        
+        return FastJSONResponse({
+            "results": search['results'],
+            "count": len(search['results']),
+            # Pass back as cursor to fetch the next page
+            "next_cursor": search['next_cursor'],
+            "filters": filters
+        })
+    except Exception as e:
+        logger.error(f"Job search error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @api_router.post("/apollo/search")
 async def apollo_search(request: ApolloSearchRequest):
     """Search Apollo.io for companies or contacts"""
@@ -655,7 +926,7 @@ async def get_cached_leads():
         for lead in leads:
             lead.pop('_id', None)
         
-        return {"results": leads, "count": len(leads)}
+        return FastJSONResponse({"results": leads, "count": len(leads)})
     except Exception as e:
         logger.error(f"Cached leads error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -680,18 +951,17 @@ app.add_middleware(
 
 @app.on_event("startup")
 async def startup_event():
-    """Load data on startup if not already loaded"""
+    """Load changed data files on startup, resuming any interrupted load"""
     try:
         logger.info("Starting up - checking data status...")
         crunchbase_count = await db.crunchbase_companies.count_documents({})
         linkedin_count = await db.linkedin_companies.count_documents({})
+        logger.info(f"Data currently loaded: {crunchbase_count} Crunchbase, {linkedin_count} LinkedIn companies")
         
-        if crunchbase_count == 0 and linkedin_count == 0:
-            logger.info("No data found - starting data load process...")
-            # Load data in background to not block startup
-            asyncio.create_task(data_loader.load_all_data())
-        else:
-            logger.info(f"Data already loaded: {crunchbase_count} Crunchbase, {linkedin_count} LinkedIn companies")
+        # The load manifest decides what actually needs loading, so unchanged data costs
+        # only a stat() per file. Load in background to not block startup.
+        await load_jobs.check_ready()
+        load_jobs.start()
     except Exception as e:
         logger.error(f"Startup error: {str(e)}")
 
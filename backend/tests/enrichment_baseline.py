@@ -0,0 +1,232 @@
+"""
+Enrichment baseline - EnrichmentService.enrich_company_data from before batched enrichment
+
+A frozen, verbatim copy of enrich_company_data and the helpers it calls as they were in
+enrichment_service.py at the commit before enrich_companies was introduced (including
+the fields parameter added with search field projection). The enrichment benchmark
+times it next to the current code, so one run reports records/sec before and after.
+It is test-only code and is never changed to follow enrichment_service.
+"""
+import logging
+import math
+import re
+from typing import Dict, Iterable, Optional
+
+from enrichment_service import resolve_search_fields
+
+logger = logging.getLogger(__name__)
+
+class BaselineEnrichment:
+    """The pre-batching enrichment, one awaited document at a time"""
+    
+    async def enrich_company_data(self, company: Dict, source: str, fields: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Enrich company data by extracting and normalizing fields in order:
+        1. Email
+        2. LinkedIn
+        3. Contact Number
+        4. Company Name
+        5. Prospect Full Name
+        
+        With fields (see SEARCH_FIELDS), only those output fields are computed.
+        """
+        try:
+            wanted = resolve_search_fields(fields)
+            enriched = {
+                'data_source': source,
+                'enrichment_fields': {}
+            }
+            
+            # 1. Email extraction
+            if 'email' in wanted:
+                emails = []
+                if source == 'crunchbase':
+                    if company.get('contact_email'):
+                        emails.append(company['contact_email'])
+                    
+                    # Extract emails from contacts
+                    contacts = company.get('contacts', [])
+                    for contact in contacts:
+                        if contact.get('name'):
+                            # Generate potential email from name and domain
+                            name = contact['name'].lower().replace(' ', '.')
+                            if company.get('website'):
+                                domain = self._extract_domain(company['website'])
+                                if domain:
+                                    emails.append(f"{name}@{domain}")
+                
+                enriched['enrichment_fields']['email'] = emails[0] if emails else None
+                enriched['all_emails'] = list(set(emails))  # Remove duplicates
+            
+            # 2. LinkedIn extraction
+            if 'linkedin' in wanted:
+                linkedin_profiles = []
+                if source == 'crunchbase':
+                    social_links = company.get('social_media_links', [])
+                    for link in social_links:
+                        if 'linkedin.com' in link:
+                            linkedin_profiles.append(link)
+                    
+                    # Extract LinkedIn IDs from contacts
+                    contacts = company.get('contacts', [])
+                    for contact in contacts:
+                        linkedin_id = contact.get('linkedin_id')
+                        if linkedin_id:
+                            linkedin_profiles.append(f"https://www.linkedin.com/in/{linkedin_id}")
+                
+                elif source == 'linkedin':
+                    if company.get('url'):
+                        linkedin_profiles.append(company['url'])
+                
+                enriched['enrichment_fields']['linkedin'] = linkedin_profiles[0] if linkedin_profiles else None
+                enriched['all_linkedin_profiles'] = list(set(linkedin_profiles))
+            
+            # 3. Contact Number
+            if 'contact_number' in wanted:
+                contact_numbers = []
+                if source == 'crunchbase':
+                    if company.get('contact_phone'):
+                        contact_numbers.append(company['contact_phone'])
+                
+                enriched['enrichment_fields']['contact_number'] = contact_numbers[0] if contact_numbers else None
+                enriched['all_contact_numbers'] = contact_numbers
+            
+            # 4. Company Name (always computed, results are deduplicated on it)
+            company_name = None
+            if source == 'crunchbase':
+                company_name = company.get('name') or company.get('legal_name')
+            elif source == 'linkedin':
+                company_name = company.get('name')
+            
+            enriched['enrichment_fields']['company_name'] = company_name
+            enriched['company_name'] = company_name
+            
+            # 5. Prospect Full Name
+            if 'prospect_full_name' in wanted:
+                prospect_names = []
+                if source == 'crunchbase':
+                    # Extract from contacts
+                    contacts = company.get('contacts', [])
+                    for contact in contacts:
+                        if contact.get('name'):
+                            prospect_names.append({
+                                'name': contact['name'],
+                                'title': contact.get('job_title'),
+                                'linkedin_id': contact.get('linkedin_id'),
+                                'departments': contact.get('departments', [])
+                            })
+                    
+                    # Extract from current_employees
+                    employees = company.get('current_employees', [])
+                    for emp in employees:
+                        if emp.get('name'):
+                            prospect_names.append({
+                                'name': emp['name'],
+                                'title': emp.get('title'),
+                                'permalink': emp.get('permalink')
+                            })
+                
+                enriched['enrichment_fields']['prospect_full_name'] = prospect_names[0]['name'] if prospect_names else None
+                enriched['all_prospects'] = prospect_names
+            
+            # Additional enrichment fields
+            if 'website' in wanted:
+                enriched['website'] = company.get('website') or company.get('url')
+            if 'industry' in wanted:
+                enriched['industry'] = self._extract_industry(company, source)
+            if 'location' in wanted:
+                enriched['location'] = self._extract_location(company, source)
+            if 'employee_count' in wanted:
+                enriched['employee_count'] = self._extract_employee_count(company, source)
+            if 'description' in wanted:
+                enriched['description'] = company.get('about') or company.get('description')
+            if 'founded_date' in wanted:
+                enriched['founded_date'] = company.get('founded_date')
+            if 'social_media' in wanted:
+                enriched['social_media'] = company.get('social_media_links', [])
+            
+            # Additional fields from source
+            if source == 'crunchbase':
+                for field in ('funding', 'cb_rank', 'operating_status'):
+                    if field in wanted:
+                        enriched[field] = company.get(field)
+                if 'founders' in wanted:
+                    enriched['founders'] = company.get('founders', [])
+            
+            elif source == 'linkedin':
+                for field in ('company_size', 'follower_count', 'address', 'zip_code'):
+                    if field in wanted:
+                        enriched[field] = company.get(field)
+                if 'specialities' in wanted:
+                    enriched['specialities'] = company.get('specialities', [])
+            
+            # Sanitize all float values to prevent JSON serialization errors
+            enriched = self._sanitize_data(enriched)
+            
+            return enriched
+            
+        except Exception as e:
+            logger.error(f"Error enriching company data: {str(e)}")
+            return {'error': str(e)}
+    
+    def _extract_domain(self, url: str) -> Optional[str]:
+        """Extract domain from URL"""
+        try:
+            if not url:
+                return None
+            # Remove protocol and www
+            domain = re.sub(r'https?://(www\.)?', '', url)
+            # Get just the domain part
+            domain = domain.split('/')[0]
+            return domain
+        except:
+            return None
+    
+    def _extract_industry(self, company: Dict, source: str) -> Optional[str]:
+        """Extract industry information"""
+        if source == 'crunchbase':
+            industries = company.get('industries', [])
+            if industries and isinstance(industries, list):
+                return ', '.join([ind.get('value', '') for ind in industries if ind.get('value')])
+        elif source == 'linkedin':
+            industries = company.get('industries', [])
+            if industries:
+                return ', '.join(industries) if isinstance(industries, list) else industries
+        return None
+    
+    def _extract_location(self, company: Dict, source: str) -> Optional[str]:
+        """Extract location information"""
+        if source == 'crunchbase':
+            return company.get('address')
+        elif source == 'linkedin':
+            parts = []
+            if company.get('city'):
+                parts.append(company['city'])
+            if company.get('state'):
+                parts.append(company['state'])
+            if company.get('country'):
+                parts.append(company['country'])
+            return ', '.join(parts) if parts else None
+        return None
+    
+    def _extract_employee_count(self, company: Dict, source: str) -> Optional[str]:
+        """Extract employee count"""
+        if source == 'crunchbase':
+            return company.get('num_employees')
+        elif source == 'linkedin':
+            emp_count = company.get('employee_count')
+            return str(emp_count) if emp_count else company.get('company_size')
+        return None
+    
+    def _sanitize_data(self, data):
+        """Sanitize data to prevent JSON serialization errors with NaN/Infinity values"""
+        if isinstance(data, dict):
+            return {k: self._sanitize_data(v) for k, v in data.items()}
+        elif isinstance(data, list):
+            return [self._sanitize_data(item) for item in data]
+        elif isinstance(data, float):
+            if math.isnan(data) or math.isinf(data):
+                return None
+            return data
+        else:
+            return data
@@ -0,0 +1,78 @@
+"""
+Enrichment benchmark - records/sec of Crunchbase enrichment on the bundled company profiles
+
+test_baseline times the enrichment from before batching (tests/enrichment_baseline.py),
+so one run of `pytest tests/test_enrichment_benchmark.py` reports records/sec before
+and after.
+"""
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from enrichment_baseline import BaselineEnrichment
+from enrichment_service import EnrichmentService
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+# Times the bundled profiles are repeated, for a batch large enough to measure
+COPIES = 20
+
+FIELD_SETS = {'all': None, 'contact': ['email', 'contact_number', 'linkedin']}
+
+@pytest.fixture(scope='module')
+def profiles():
+    profiles = []
+    for filename in ('crunchbase-company-profiles.json', 'crunchbase-keyword-results.json'):
+        json_file = DATA_DIR / filename
+        if json_file.exists():
+            with open(json_file) as f:
+                profiles.extend(json.load(f))
+    if not profiles:
+        pytest.skip(f"No Crunchbase profiles found in {DATA_DIR}")
+    return profiles * COPIES
+
+@pytest.fixture(scope='module')
+def service():
+    return EnrichmentService(db=None)
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+@pytest.fixture(params=list(FIELD_SETS))
+def fields(request, benchmark):
+    benchmark.group = f"enrichment[{request.param} fields]"
+    return FIELD_SETS[request.param]
+
+# Each variant returns its records, as a search would
+async def baseline(profiles, fields):
+    enrichment = BaselineEnrichment()
+    return [await enrichment.enrich_company_data(profile, 'crunchbase', fields) for profile in profiles]
+
+async def per_document(service, profiles, fields):
+    return [await service.enrich_company_data(profile, 'crunchbase', fields) for profile in profiles]
+
+def test_baseline(benchmark, service, profiles, fields, loop):
+    records = benchmark(lambda: loop.run_until_complete(baseline(profiles, fields)))
+    # Batching changed how records are computed, not what they hold
+    assert records == service.enrich_companies(profiles, 'crunchbase', fields)
+
+# enrich_company_data now runs the batch path on a single record; this is what a caller
+# that still enriches one document at a time gets
+def test_per_document(benchmark, service, profiles, fields, loop):
+    records = benchmark(lambda: loop.run_until_complete(per_document(service, profiles, fields)))
+    assert records == service.enrich_companies(profiles, 'crunchbase', fields)
+
+def test_batch(benchmark, service, profiles, fields):
+    records = benchmark(service.enrich_companies, profiles, 'crunchbase', fields)
+    assert len(records) == len(profiles)
+
+def test_batch_in_thread(benchmark, service, profiles, fields, loop):
+    records = benchmark(lambda: loop.run_until_complete(service.enrich_company_batch(profiles, 'crunchbase', fields)))
+    assert records == service.enrich_companies(profiles, 'crunchbase', fields)
@@ -0,0 +1,87 @@
+"""
+Entity resolution - record keys, pair scores and clustering in entity_resolution
+"""
+import pytest
+
+import entity_resolution
+from entity_resolution import MATCH_THRESHOLD, key_record, match_score, normalize_name, resolve_clusters
+
+def crunchbase(name, country=None, website=None, links=()):
+    return key_record('crunchbase_companies', {
+        'name': name, 'country_code': country, 'website': website, 'social_media_links': list(links),
+    })
+
+def linkedin(name, country=None, website=None, url=None):
+    return key_record('linkedin_companies', {'name': name, 'country': country, 'website': website, 'url': url})
+
+def apollo(name, country=None, location=None, website=None):
+    return key_record('enriched_data', {
+        'company_name': name, 'website': website, 'location': location,
+        'company_details': {'country': country} if country else {},
+    })
+
+@pytest.mark.parametrize('name, normalized', [
+    ('Apple Inc.', 'apple'),
+    ('Adyen N.V.', 'adyen'),
+    ('Banco Santander, S.A.', 'banco santander'),
+    ('Philips B.V.', 'philips'),
+    ('A.B.C. Holdings', 'abc'),
+    ('Procter & Gamble Co', 'procter and gamble'),
+    ('Group', 'group'),
+])
+def test_normalize_name(name, normalized):
+    assert normalize_name(name) == normalized
+
+def test_key_record_normalizes_each_source():
+    assert crunchbase('Falabella S.A.', 'Chile', 'https://www.falabella.com/about',
+                      ['https://www.linkedin.com/company/falabella/']) == {
+        'name': 'falabella', 'domain': 'falabella.com', 'linkedin': 'falabella', 'country': 'CL',
+    }
+    assert linkedin('Falabella', 'CL', 'falabella.com', 'https://linkedin.com/company/falabella')['country'] == 'CL'
+    assert crunchbase('Adyen', 'The Netherlands')['country'] == 'NL'
+    assert apollo('Adyen', 'NLD')['country'] == 'NL'
+
+def test_key_record_apollo_location_country():
+    assert apollo('Acme', location='Berlin, Germany')['country'] == 'DE'
+    # The tail of a location without a country is a state, not a country
+    assert apollo('Acme', location='San Francisco, California')['country'] is None
+    assert apollo('Acme', location='San Francisco, CA')['country'] is None
+
+def test_unrecognised_countries_are_dropped():
+    assert crunchbase('Acme', 'Atlantis')['country'] is None
+    assert linkedin('Acme', '')['country'] is None
+
+def test_match_score_country_names_and_codes_agree():
+    assert match_score(crunchbase('Falabella', 'Chile'), linkedin('Falabella', 'CL')) >= MATCH_THRESHOLD
+    assert match_score(crunchbase('Adyen N.V.', 'The Netherlands'), linkedin('Adyen', 'NL')) >= MATCH_THRESHOLD
+
+def test_match_score_penalizes_only_recognised_country_mismatches():
+    assert match_score(crunchbase('Acme', 'France'), linkedin('Acme', 'US')) < MATCH_THRESHOLD
+    assert match_score(apollo('Acme', location='Austin, Texas'), linkedin('Acme', 'US')) >= MATCH_THRESHOLD
+
+def test_match_score_domain_outweighs_country_mismatch():
+    a = crunchbase('Acme', 'France', 'acme.com')
+    b = linkedin('Acme Corp', 'US', 'https://acme.com')
+    assert match_score(a, b) >= MATCH_THRESHOLD
+
+def test_match_score_conflicting_domains():
+    assert match_score(crunchbase('Acme', website='acme.com'), linkedin('Acme', website='acme.io')) < MATCH_THRESHOLD
+
+def test_resolve_clusters():
+    keys = [
+        crunchbase('Falabella S.A.', 'Chile'),
+        linkedin('Falabella', 'CL', url='https://linkedin.com/company/falabella'),
+        apollo('Falabella Retail', website='falabella.com'),
+        linkedin('Falabella', 'FR'),
+        crunchbase('Globex', 'United States', 'globex.com'),
+        apollo('Globex Corporation', 'US', website='https://www.globex.com'),
+        linkedin('Initech'),
+    ]
+    # "Falabella Retail" shares no name, domain or LinkedIn page with the others; the
+    # French namesake is outweighed by its country
+    assert resolve_clusters(keys) == [0, 0, 2, 3, 4, 4, 6]
+
+def test_resolve_clusters_large_blocks_compare_against_first(monkeypatch):
+    monkeypatch.setattr(entity_resolution, 'MAX_BLOCK_SIZE', 2)
+    keys = [linkedin('Acme', 'US'), linkedin('Acme', 'US'), linkedin('Acme', 'US')]
+    assert resolve_clusters(keys) == [0, 0, 0]
@@ -0,0 +1,89 @@
+"""
+Index verification - data_loader.verify_indexes explains the real search cursors and rejects whole-index walks
+"""
+import asyncio
+
+import pytest
+
+from data_loader import DataLoader, _unbounded_index_scans
+from enrichment_service import JOB_SEARCH_SORT, SEARCH_PAGE_SORT, TEXT_SCORE_SORT
+
+def ixscan(index_name, bounds):
+    return {'stage': 'IXSCAN', 'indexName': index_name, 'keyPattern': {field: 1 for field in bounds},
+            'indexBounds': bounds}
+
+ID_WALK = {'stage': 'FETCH', 'inputStage': ixscan('_id_', {'_id': ['[MinKey, MaxKey]']})}
+JOBS_BY_SALARY = {'stage': 'FETCH', 'inputStage': ixscan('listed_time_-1__id_-1_normalized_salary_1', {
+    'listed_time': ['[MaxKey, MinKey]'], '_id': ['[MaxKey, MinKey]'], 'normalized_salary': ['[100000, 200000]'],
+})}
+
+def test_id_index_walk_under_a_filter_is_unbounded():
+    assert _unbounded_index_scans(ID_WALK, ['_id']) == ['_id_']
+    assert _unbounded_index_scans(ID_WALK, []) == ['_id_']
+
+def test_sort_index_narrowed_on_a_later_key_is_allowed():
+    assert _unbounded_index_scans(JOBS_BY_SALARY, ['listed_time', '_id']) == []
+    # The same walk without the sort it serves reads the whole index for nothing
+    assert _unbounded_index_scans(JOBS_BY_SALARY, []) == ['listed_time_-1__id_-1_normalized_salary_1']
+
+class ExplainedCursor:
+    def __init__(self, explained, query_filter, projection, plan):
+        self.explained = explained
+        self.shape = {'filter': query_filter, 'projection': projection, 'sort': None, 'limit': None}
+        self.plan = plan
+
+    def sort(self, sort):
+        self.shape['sort'] = sort
+        return self
+
+    def limit(self, limit):
+        self.shape['limit'] = limit
+        return self
+
+    async def explain(self):
+        self.explained.append(self.shape)
+        return {'queryPlanner': {'winningPlan': self.plan(self.shape)}}
+
+class ExplainedCollection:
+    def __init__(self, explained, plan):
+        self.explained = explained
+        self.plan = plan
+
+    def find(self, query_filter, projection=None):
+        return ExplainedCursor(self.explained, query_filter, projection, self.plan)
+
+class ExplainedDatabase(dict):
+    def __init__(self, plan):
+        super().__init__()
+        self.explained = []
+        self.plan = plan
+
+    def __missing__(self, name):
+        return ExplainedCollection(self.explained, self.plan)
+
+def index_plan(shape):
+    return {'stage': 'FETCH', 'inputStage': ixscan('name_1', {'name': ['["verify", "verifz")']})}
+
+def test_verify_explains_each_cursor_with_its_sort_and_limit():
+    db = ExplainedDatabase(index_plan)
+    report = asyncio.run(DataLoader(db).verify_indexes())
+
+    assert len(report) == len(db.explained)
+    sorts = [shape['sort'] for shape in db.explained]
+    assert TEXT_SCORE_SORT in sorts and JOB_SEARCH_SORT in sorts and SEARCH_PAGE_SORT in sorts
+    for shape in db.explained:
+        if shape['sort'] == TEXT_SCORE_SORT:
+            assert shape['projection'] == dict(TEXT_SCORE_SORT)
+            assert shape['limit'] == 50
+        if shape['sort'] == JOB_SEARCH_SORT:
+            assert shape['limit'] == 50
+
+def test_verify_fails_when_a_sorted_cursor_walks_the_id_index():
+    db = ExplainedDatabase(lambda shape: ID_WALK if shape['sort'] == JOB_SEARCH_SORT else index_plan(shape))
+    with pytest.raises(RuntimeError, match='_id_'):
+        asyncio.run(DataLoader(db).verify_indexes())
+
+def test_verify_fails_when_a_search_page_walks_the_id_index():
+    db = ExplainedDatabase(lambda shape: ID_WALK if shape['sort'] == SEARCH_PAGE_SORT else index_plan(shape))
+    with pytest.raises(RuntimeError, match=r'search\[industry\+page\] on crunchbase_companies \(_id_\)'):
+        asyncio.run(DataLoader(db).verify_indexes())
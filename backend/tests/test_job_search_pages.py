@@ -0,0 +1,54 @@
+"""
+Job search pages - enrichment_service keyset positions walk JOB_SEARCH_SORT order without gaps or repeats
+"""
+import pytest
+
+from enrichment_service import (
+    JOB_SEARCH_SORT, build_job_search_after, decode_job_search_cursor, encode_search_cursor
+)
+
+def matches(document, clause):
+    for field, condition in clause.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if value is None or not value < condition['$lt']:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+def sort_key(document):
+    # Descending on both keys, with a missing listed_time after every value
+    listed_time = document.get('listed_time')
+    return (listed_time is None, -(listed_time or 0), -document['_id'])
+
+JOBS = [
+    {'_id': 1, 'listed_time': 300}, {'_id': 2, 'listed_time': 300}, {'_id': 3, 'listed_time': 100},
+    {'_id': 4}, {'_id': 5, 'listed_time': 200}, {'_id': 6, 'listed_time': 300}, {'_id': 7},
+    {'_id': 8, 'listed_time': None},
+]
+
+@pytest.mark.parametrize('limit', [1, 2, 3, len(JOBS)])
+def test_pages_cover_every_job_once_in_sort_order(limit):
+    assert JOB_SEARCH_SORT == [('listed_time', -1), ('_id', -1)]
+    ordered = sorted(JOBS, key=sort_key)
+    seen, position = [], None
+    while True:
+        remaining = ordered
+        if position:
+            after = build_job_search_after(position)
+            remaining = [job for job in ordered if any(matches(job, clause) for clause in after['$or'])]
+        page = remaining[:limit]
+        seen += page
+        if len(page) < limit:
+            break
+        position = {'listed_time': page[-1].get('listed_time'), 'after': page[-1]['_id']}
+    assert seen == ordered
+
+def test_cursor_without_listed_time_is_rejected():
+    token = encode_search_cursor({'linkedin_jobs': {'after': 5}})
+    with pytest.raises(ValueError):
+        decode_job_search_cursor(token)
+
+    token = encode_search_cursor({'linkedin_jobs': {'listed_time': None, 'after': 5}})
+    assert decode_job_search_cursor(token) == {'linkedin_jobs': {'listed_time': None, 'after': 5}}
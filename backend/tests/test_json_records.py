@@ -0,0 +1,120 @@
+"""
+Streaming JSON parser - data_loader.iter_json_records over JSON arrays and NDJSON
+"""
+import json
+
+import pytest
+
+import data_loader
+from data_loader import iter_json_records
+
+RECORDS = [
+    {'id': 'a', 'name': 'Acme, Inc.', 'tags': ['x', {'nested': [1, 2]}]},
+    {'id': 'b', 'about': 'Quotes \\" and braces {[,]} inside a string', 'n': 1.5},
+    {'id': 'c', 'name': 'Ünïcödé', 'empty': {}},
+    {'id': 'd', 'list': []},
+]
+
+# Small chunks put chunk boundaries inside strings, escapes, numbers and separators
+CHUNK_SIZES = [1, 2, 7, 64, 1 << 20]
+
+@pytest.fixture(params=CHUNK_SIZES)
+def chunk_size(request, monkeypatch):
+    monkeypatch.setattr(data_loader, 'READ_CHUNK_SIZE', request.param)
+    return request.param
+
+def write(tmp_path, text, name='companies.json'):
+    path = tmp_path / name
+    path.write_text(text, encoding='utf-8')
+    return path
+
+def read_all(path, **kwargs):
+    stats = {}
+    return list(iter_json_records(path, stats, **kwargs)), stats
+
+def test_array_across_chunk_boundaries(tmp_path, chunk_size):
+    for text in (json.dumps(RECORDS), json.dumps(RECORDS, indent=2), '[' + ' ,\n '.join(map(json.dumps, RECORDS)) + ' ]'):
+        records, stats = read_all(write(tmp_path, text))
+        assert records == RECORDS
+        assert stats['records'] == len(RECORDS)
+        assert stats['invalid'] == 0
+        assert stats['bytes_read'] == len(text)
+
+def test_empty_array(tmp_path, chunk_size):
+    assert read_all(write(tmp_path, '[]'))[0] == []
+    assert read_all(write(tmp_path, '[\n]\n'))[0] == []
+
+def test_ndjson_across_chunk_boundaries(tmp_path, chunk_size):
+    text = '\n'.join(map(json.dumps, RECORDS)) + '\n'
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS
+    assert stats['records'] == len(RECORDS)
+    assert stats['byte_offset'] == len(text.encode('utf-8'))
+
+def test_array_resume_skips_consumed_elements(tmp_path, chunk_size):
+    path = write(tmp_path, json.dumps(RECORDS))
+    for skip in range(len(RECORDS) + 1):
+        records, stats = read_all(path, skip_records=skip)
+        assert records == RECORDS[skip:]
+        assert stats['records'] == len(RECORDS)
+
+def test_ndjson_resume_from_byte_offset(tmp_path, chunk_size):
+    path = write(tmp_path, '\n'.join(map(json.dumps, RECORDS)) + '\n')
+    for consumed in range(len(RECORDS) + 1):
+        stats = {}
+        records = iter_json_records(path, stats)
+        head = [next(records) for _ in range(consumed)]
+        records.close()
+        assert head == RECORDS[:consumed]
+        
+        resumed, resumed_stats = read_all(path, skip_records=stats.get('records', 0), byte_offset=stats.get('byte_offset', 0))
+        assert resumed == RECORDS[consumed:]
+        assert resumed_stats['records'] == len(RECORDS)
+
+def test_malformed_element_in_single_line_array(tmp_path, chunk_size):
+    text = json.dumps(RECORDS[:2])[:-1] + ', {"id": "bad", "x": }, ' + json.dumps(RECORDS[2:])[1:]
+    assert '\n' not in text
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS
+    assert stats['invalid'] == 1
+    assert stats['records'] == len(RECORDS) + 1
+
+def test_malformed_element_with_separators_inside(tmp_path, chunk_size):
+    # Commas, brackets and quotes inside the bad element's strings and nested values
+    # must not be taken for the end of the element
+    bad = '{"id": "bad", "s": "a,{\\"b\\": [1,]}", "nested": [{"x": 1}, {"y": 2}], "oops": tru}'
+    text = '[' + json.dumps(RECORDS[0]) + ',' + bad + ',' + ','.join(map(json.dumps, RECORDS[1:])) + ']'
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS
+    assert stats['invalid'] == 1
+
+def test_malformed_last_element(tmp_path, chunk_size):
+    text = json.dumps(RECORDS)[:-1] + ', {"id": "bad" "x": 1}]'
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS
+    assert stats['invalid'] == 1
+
+def test_malformed_elements_keep_resume_offsets(tmp_path, chunk_size):
+    text = '[' + ','.join([json.dumps(RECORDS[0]), '{"bad": }', json.dumps(RECORDS[1]), 'nope', json.dumps(RECORDS[2])]) + ']'
+    path = write(tmp_path, text)
+    assert read_all(path)[0] == RECORDS[:3]
+    # Malformed elements count as consumed, so skip_records lines up with a fresh read
+    assert read_all(path, skip_records=2)[0] == RECORDS[1:3]
+    assert read_all(path, skip_records=4)[0] == RECORDS[2:3]
+
+def test_non_object_elements_are_invalid(tmp_path, chunk_size):
+    text = '[' + ','.join([json.dumps(RECORDS[0]), '1', '"text"', 'null', '[1, 2]', json.dumps(RECORDS[1])]) + ']'
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS[:2]
+    assert stats['invalid'] == 4
+
+def test_unterminated_element_raises(tmp_path, chunk_size):
+    text = json.dumps(RECORDS[:2])[:-1] + ', {"id": "bad", "x": [1, 2'
+    with pytest.raises(ValueError):
+        read_all(write(tmp_path, text))
+
+def test_ndjson_malformed_line_is_skipped(tmp_path, chunk_size):
+    text = json.dumps(RECORDS[0]) + '\n{"id": "bad",\n\n' + '\n'.join(map(json.dumps, RECORDS[1:])) + '\n'
+    records, stats = read_all(write(tmp_path, text))
+    assert records == RECORDS
+    assert stats['invalid'] == 1
@@ -0,0 +1,27 @@
+"""
+Search filters - enrichment_service.build_query_clauses matches the same fields with and without index candidates
+"""
+import pytest
+
+from enrichment_service import SEARCH_QUERY_FIELDS, build_query_clauses
+
+def clause_fields(clauses):
+    fields = set()
+    for clause in clauses:
+        if '$or' in clause:
+            fields |= clause_fields(clause['$or'])
+        fields |= {key for key in clause if key not in ('$or', '_id')}
+    return fields
+
+@pytest.mark.parametrize('collection', list(SEARCH_QUERY_FIELDS))
+def test_candidates_keep_query_semantics(collection):
+    without_index = build_query_clauses(collection, 'soft')
+    with_index = build_query_clauses(collection, 'soft', ['id-1'])
+    assert clause_fields(with_index) == clause_fields(without_index)
+    assert [c for c in with_index if '$text' in c] == [c for c in without_index if '$text' in c]
+
+def test_free_text_fields_use_the_text_index():
+    clauses = build_query_clauses('crunchbase_companies', 'soft', ['id-1'])
+    assert {'$text': {'$search': 'soft'}} in clauses
+    assert 'about' not in clause_fields(clauses)
+    assert clause_fields(build_query_clauses('enriched_data', 'soft')) == set(SEARCH_QUERY_FIELDS['enriched_data'])
@@ -0,0 +1,170 @@
+"""
+Trigram search index - search_index.CompanySearchIndex lookups and refreshes over fake collections
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+import search_index
+from search_index import CompanySearchIndex
+
+def matches(document, query_filter):
+    for field, condition in query_filter.items():
+        value = document.get(field)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for operator, operand in condition.items():
+            if operator == '$in' and value not in operand:
+                return False
+            if operator == '$gte' and (value is None or value < operand):
+                return False
+            if operator == '$gt' and (value is None or value <= operand):
+                return False
+    return True
+
+class FakeCursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+class FakeCollection:
+    """The slice of a motor collection the index reads, counting the calls it gets"""
+    def __init__(self):
+        self.documents = {}
+        self.calls = 0
+
+    def write(self, document):
+        self.documents[document['_id']] = dict(document)
+
+    async def estimated_document_count(self):
+        self.calls += 1
+        return len(self.documents)
+
+    async def find_one(self, query_filter, projection=None, sort=None):
+        self.calls += 1
+        ids = sorted(self.documents, reverse=True)
+        return {'_id': ids[0]} if ids else None
+
+    def find(self, query_filter, projection=None):
+        self.calls += 1
+        return FakeCursor([dict(d) for _, d in sorted(self.documents.items()) if matches(d, query_filter)])
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+@pytest.fixture
+def db():
+    return FakeDatabase()
+
+@pytest.fixture
+def loader():
+    return SimpleNamespace(generation=0, loading=False)
+
+@pytest.fixture
+def index(db, loader, monkeypatch):
+    monkeypatch.setattr(search_index, 'SNAPSHOT_CHECK_INTERVAL', 3600)
+    return CompanySearchIndex(db, loader)
+
+_ids = itertools.count(1)
+
+def crunchbase(db, name, loaded_at, _id=None):
+    db['crunchbase_companies'].write({'_id': _id or next(_ids), 'name': name, 'about': '', '_loaded_at': loaded_at})
+
+def linkedin(db, name, loaded_at, _id=None):
+    db['linkedin_companies'].write({'_id': _id or next(_ids), 'name': name, '_loaded_at': loaded_at})
+
+def test_lookup_before_refresh_and_unanswerable_queries(db, index):
+    crunchbase(db, 'Acme Robotics', '2026-01-01')
+    assert asyncio.run(index.lookup('acme')) is None
+
+    asyncio.run(index.refresh())
+    assert asyncio.run(index.lookup('ac')) is None
+    assert asyncio.run(index.lookup('ac.e')) is None
+
+def test_lookup_returns_candidates_per_collection(db, index):
+    crunchbase(db, 'Acme Robotics', '2026-01-01', _id='cb-1')
+    crunchbase(db, 'Globex', '2026-01-01', _id='cb-2')
+    linkedin(db, 'ACME Corp', '2026-01-01', _id='li-1')
+    asyncio.run(index.refresh())
+
+    candidates = asyncio.run(index.lookup('Acme'))
+    assert candidates == {'enriched_data': [], 'crunchbase_companies': ['cb-1'], 'linkedin_companies': ['li-1']}
+
+def test_lookup_reuses_snapshots_between_checks(db, index):
+    crunchbase(db, 'Acme Robotics', '2026-01-01')
+    asyncio.run(index.refresh())
+    calls = sum(collection.calls for collection in db.values())
+
+    for _ in range(5):
+        assert asyncio.run(index.lookup('acme')) is not None
+    assert sum(collection.calls for collection in db.values()) == calls
+
+def test_refresh_keeps_records_sharing_the_watermark(db, index):
+    # Every record of a file shares one loaded_at; the second half lands after a refresh
+    linkedin(db, 'Acme One', '2026-01-01T00:00:00', _id='li-1')
+    asyncio.run(index.refresh())
+    linkedin(db, 'Acme Two', '2026-01-01T00:00:00', _id='li-2')
+    asyncio.run(index.refresh())
+
+    assert asyncio.run(index.lookup('acme'))['linkedin_companies'] == ['li-1', 'li-2']
+    # The record already indexed at the watermark was not indexed twice
+    assert index.stats()['dead_ordinals'] == 0
+
+def test_no_narrowing_or_refresh_while_loading(db, loader, index):
+    crunchbase(db, 'Acme Robotics', '2026-01-01')
+    asyncio.run(index.refresh())
+
+    loader.loading = True
+    crunchbase(db, 'Acme Labs', '2026-01-02')
+    assert asyncio.run(index.lookup('acme')) is None
+    assert index.refresh_task is None
+
+def test_generation_bump_marks_index_stale(db, loader, index):
+    crunchbase(db, 'Acme Robotics', '2026-01-01', _id='cb-1')
+    asyncio.run(index.refresh())
+
+    # A reload rewrites the record in place: count and largest _id stay the same
+    crunchbase(db, 'Initech', '2026-01-02', _id='cb-1')
+    loader.generation += 1
+
+    async def search_then_catch_up():
+        stale = await index.lookup('initech')
+        await index.refresh_task
+        return stale, await index.lookup('initech'), await index.lookup('acme')
+
+    stale, fresh, old_name = asyncio.run(search_then_catch_up())
+    assert stale is None
+    assert fresh['crunchbase_companies'] == ['cb-1']
+    assert old_name['crunchbase_companies'] == []
+
+def test_external_writes_are_noticed_after_the_check_interval(db, index, monkeypatch):
+    db['enriched_data'].write({'_id': 1, 'company_name': 'Acme', 'data_source': 'apollo_csv'})
+    asyncio.run(index.refresh())
+    db['enriched_data'].write({'_id': 2, 'company_name': 'Acme Two', 'data_source': 'apollo_csv'})
+
+    assert asyncio.run(index.lookup('acme'))['enriched_data'] == [1]
+    monkeypatch.setattr(search_index, 'SNAPSHOT_CHECK_INTERVAL', 0)
+
+    async def search_then_catch_up():
+        stale = await index.lookup('acme')
+        await index.refresh_task
+        return stale, await index.lookup('acme')
+
+    stale, fresh = asyncio.run(search_then_catch_up())
+    assert 'enriched_data' not in stale
+    assert fresh['enriched_data'] == [1, 2]